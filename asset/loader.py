@@ -4,7 +4,9 @@ from common.logger import Logger
 from common.dbisam import db_exec
 from common.util import hashify, local_pg_params
 from asset.post_processor import doc_post_processor
+from asset.schema import ensure_asset_table
 from asset.xformer import xformer
+from search.cache import search_cache
 from typing import List
 
 import json
@@ -60,6 +62,7 @@ def pg_upserter(docs, table_name) -> None:
             upsert_count += cursor.rowcount
 
         conn.commit()
+        search_cache.invalidate(table_name)
 
         logger.send_message(
             directive="note",
@@ -174,6 +177,7 @@ def loader(body, repo):
         )
 
         # print(json.dumps(docs, indent=2))
+        ensure_asset_table(body.asset)
         pg_upserter(docs, body.asset)
 
     except Exception as error:
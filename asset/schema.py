@@ -0,0 +1,372 @@
+import os
+import psycopg2
+import sys
+import threading
+
+from contextlib import closing
+from dotenv import load_dotenv
+from psycopg2 import sql
+from common.logger import Logger
+from common.util import local_pg_params
+from typing import List, Set
+
+load_dotenv()
+logger = Logger(__name__)
+
+# asset tables checked at worker startup (others are created on first load)
+# and migrated by: python -m asset.schema
+ASSET_TABLES = [
+    "core",
+    "dst",
+    "formation",
+    "ip",
+    "perforation",
+    "production",
+    "raster_log",
+    "survey",
+    "vector_log",
+    "well",
+    "zone",
+]
+
+# trigram index on doc text, used by leading-wildcard search terms
+FTS_TRIGRAM_INDEX = os.environ.get("FTS_TRIGRAM_INDEX", "true").lower() == "true"
+
+# an initial load with at least this many loader tasks defers index upkeep
+FTS_DEFER_INDEX_TASKS = int(os.environ.get("FTS_DEFER_INDEX_TASKS") or 10)
+
+TS_EXPRESSION = "jsonb_to_tsvector('english', doc, '[\"string\", \"numeric\"]')"
+
+# UWI/API number reduced to uppercase letters and digits (42-501-20130 and
+# 4250120130 are the same well), for index-backed identifier search
+UWI_EXPRESSION = "regexp_replace(upper(doc->'well'->>'uwi'), '[^0-9A-Z]', '', 'g')"
+
+CREATE_TABLE_SQL = sql.SQL(
+    "CREATE TABLE IF NOT EXISTS {table} ("
+    "id TEXT PRIMARY KEY, "
+    "repo_id TEXT, "
+    "repo_name TEXT, "
+    "well_id TEXT, "
+    "suite TEXT, "
+    "tag TEXT, "
+    "doc JSONB, "
+    "ts TSVECTOR GENERATED ALWAYS AS (" + TS_EXPRESSION + ") STORED, "
+    "uwi_norm TEXT GENERATED ALWAYS AS (" + UWI_EXPRESSION + ") STORED)"
+)
+
+ADD_TS_COLUMN_SQL = sql.SQL(
+    "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS "
+    "ts TSVECTOR GENERATED ALWAYS AS (" + TS_EXPRESSION + ") STORED"
+)
+
+ADD_UWI_COLUMN_SQL = sql.SQL(
+    "ALTER TABLE {table} ADD COLUMN IF NOT EXISTS "
+    "uwi_norm TEXT GENERATED ALWAYS AS (" + UWI_EXPRESSION + ") STORED"
+)
+
+# search indexes are built CONCURRENTLY so searches and loads keep running
+
+CREATE_TS_INDEX_SQL = sql.SQL(
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS {index} ON {table} USING GIN (ts)"
+)
+
+CREATE_TRGM_INDEX_SQL = sql.SQL(
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS {index} ON {table} "
+    "USING GIN ((doc::text) gin_trgm_ops)"
+)
+
+# prefix LIKE (i.e. '4250120%') on any collation
+CREATE_UWI_INDEX_SQL = sql.SQL(
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS {index} ON {table} "
+    "(uwi_norm text_pattern_ops)"
+)
+
+# infix/suffix LIKE (i.e. '%20130')
+CREATE_UWI_TRGM_INDEX_SQL = sql.SQL(
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS {index} ON {table} "
+    "USING GIN (uwi_norm gin_trgm_ops)"
+)
+
+# indexdef patterns (from pg_indexes) for the search indexes of a table
+TS_INDEX_PATTERN = "%USING gin (ts)%"
+TRGM_INDEX_PATTERN = "%(doc)::text) gin_trgm_ops%"
+UWI_INDEX_PATTERN = "%(uwi_norm text_pattern_ops)%"
+UWI_TRGM_INDEX_PATTERN = "%(uwi_norm gin_trgm_ops)%"
+
+DROP_INDEX_SQL = sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {index}")
+
+_ensured = set()
+_ensured_lock = threading.Lock()
+_table_locks = {}
+_search_columns = {}  # table -> generated search columns it has
+
+
+def table_exists(cur, table: str) -> bool:
+    cur.execute("SELECT to_regclass(%s) IS NOT NULL", (table,))
+    return cur.fetchone()[0]
+
+
+def has_column(cur, table: str, column: str) -> bool:
+    cur.execute(
+        "SELECT EXISTS (SELECT 1 FROM information_schema.columns "
+        "WHERE table_name = %s AND column_name = %s)",
+        (table, column),
+    )
+    return cur.fetchone()[0]
+
+
+def has_index(cur, table: str, pattern: str) -> bool:
+    """
+    :return: True if the table has a valid index matching pattern (a failed
+        CREATE INDEX CONCURRENTLY leaves an invalid one behind)
+    """
+    cur.execute(
+        "SELECT EXISTS (SELECT 1 FROM pg_indexes i "
+        "JOIN pg_class c ON c.relname = i.indexname "
+        "JOIN pg_index x ON x.indexrelid = c.oid "
+        "WHERE i.tablename = %s AND i.indexdef LIKE %s AND x.indisvalid)",
+        (table, pattern),
+    )
+    return cur.fetchone()[0]
+
+
+def is_empty(cur, table: str) -> bool:
+    cur.execute(
+        sql.SQL("SELECT NOT EXISTS (SELECT 1 FROM {})").format(sql.Identifier(table))
+    )
+    return cur.fetchone()[0]
+
+
+def has_trigram(cur) -> bool:
+    cur.execute(
+        "SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm')"
+    )
+    return cur.fetchone()[0]
+
+
+def index_names(table: str) -> dict:
+    return {
+        "ts": f"{table}_ts_gin",
+        "trgm": f"{table}_doc_trgm",
+        "uwi": f"{table}_uwi_norm",
+        "uwi_trgm": f"{table}_uwi_norm_trgm",
+    }
+
+
+def create_search_indexes(cur, table: str) -> List[str]:
+    """
+    Create whichever search indexes the table lacks, CONCURRENTLY so the table
+    stays readable and writable. Existing indexes are recognized by definition,
+    not name, so hand-made ones are not duplicated. An invalid leftover of
+    ours (from an interrupted build) is dropped and rebuilt.
+    :param cur: A psycopg2 cursor on an autocommit connection
+    :param table: The asset/table name
+    :return: List of created index names
+    """
+    names = index_names(table)
+    created = []
+
+    indexes = [
+        ("ts", TS_INDEX_PATTERN, CREATE_TS_INDEX_SQL),
+        ("uwi", UWI_INDEX_PATTERN, CREATE_UWI_INDEX_SQL),
+    ]
+    trigram_indexes = [
+        ("trgm", TRGM_INDEX_PATTERN, CREATE_TRGM_INDEX_SQL),
+        ("uwi_trgm", UWI_TRGM_INDEX_PATTERN, CREATE_UWI_TRGM_INDEX_SQL),
+    ]
+
+    if FTS_TRIGRAM_INDEX:
+        missing = [i for i in trigram_indexes if not has_index(cur, table, i[1])]
+        if missing and not has_trigram(cur):
+            logger.warning(
+                f"pg_trgm is not installed; leading-wildcard searches on {table} "
+                f"will use sequential scans"
+            )
+        elif missing:
+            cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            indexes.extend(missing)
+
+    # uwi_norm/ts indexes wait for migrate_asset_table on a legacy table
+    column = {"ts": "ts", "uwi": "uwi_norm", "uwi_trgm": "uwi_norm"}
+
+    for key, pattern, statement in indexes:
+        if key in column and not has_column(cur, table, column[key]):
+            continue
+        if not has_index(cur, table, pattern):
+            index = sql.Identifier(names[key])
+            cur.execute(DROP_INDEX_SQL.format(index=index))
+            cur.execute(statement.format(index=index, table=sql.Identifier(table)))
+            created.append(names[key])
+
+    return created
+
+
+def missing_columns(cur, table: str) -> List[tuple]:
+    """
+    :return: (column, ADD COLUMN statement) for generated columns not yet on
+        the table
+    """
+    return [
+        (column, statement)
+        for column, statement in [
+            ("ts", ADD_TS_COLUMN_SQL),
+            ("uwi_norm", ADD_UWI_COLUMN_SQL),
+        ]
+        if not has_column(cur, table, column)
+    ]
+
+
+def search_columns(cur, table: str, refresh: bool = False) -> Set[str]:
+    """
+    Which generated search columns (ts, uwi_norm) a table has. A legacy table
+    lacks them until migrate_asset_table, so searches must not assume them.
+    Checked once per table per process unless refreshed.
+    :param cur: A psycopg2 cursor
+    :param table: The asset/table name
+    :param refresh: Check again (after adding columns)
+    :return: Set of column names
+    """
+    with _ensured_lock:
+        columns = None if refresh else _search_columns.get(table)
+    if columns is None:
+        columns = {c for c in ("ts", "uwi_norm") if has_column(cur, table, c)}
+        with _ensured_lock:
+            _search_columns[table] = columns
+    return columns
+
+
+def table_lock(table: str) -> threading.Lock:
+    with _ensured_lock:
+        return _table_locks.setdefault(table, threading.Lock())
+
+
+def ensure_asset_table(table: str, force: bool = False) -> None:
+    """
+    Make sure an asset table exists with generated ts (tsvector) and uwi_norm
+    columns and their search indexes. Runs once per table per process unless
+    forced. Adding a generated column rewrites the whole table under an ACCESS
+    EXCLUSIVE lock, so that is only done here for empty tables; a populated
+    table missing a column is reported for migrate_asset_table instead.
+    :param table: The asset/table name
+    :param force: Check again even if already ensured by this process
+    :return: None
+    """
+    with table_lock(table):
+        if table in _ensured and not force:
+            return
+
+        with closing(psycopg2.connect(**local_pg_params())) as conn:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                if not table_exists(cur, table):
+                    cur.execute(CREATE_TABLE_SQL.format(table=sql.Identifier(table)))
+                    logger.info(f"created asset table: {table}")
+
+                missing = missing_columns(cur, table)
+                if missing and is_empty(cur, table):
+                    for column, statement in missing:
+                        cur.execute(statement.format(table=sql.Identifier(table)))
+                        logger.info(f"added {column} column to {table}")
+                elif missing:
+                    logger.warning(
+                        f"{table} lacks {", ".join(c for c, _ in missing)}; searches "
+                        f"on it will fail or scan sequentially until it is migrated "
+                        f"with: python -m asset.schema {table} (rewrites the table)"
+                    )
+                search_columns(cur, table, refresh=True)
+
+                for index in create_search_indexes(cur, table):
+                    logger.info(f"created search index: {index}")
+
+        with _ensured_lock:
+            _ensured.add(table)
+
+
+def ensure_asset_schema(tables: List[str] = None) -> None:
+    """
+    Worker startup check: ensure every known asset table is searchable, and
+    warn loudly about any that would fall back to sequential scans. Missing
+    indexes are built concurrently, so PurrWorker runs this on a background
+    thread rather than blocking startup.
+    :param tables: Asset tables to check (default ASSET_TABLES)
+    :return: None
+    """
+    for table in tables or ASSET_TABLES:
+        try:
+            ensure_asset_table(table, force=True)
+        except psycopg2.Error as error:
+            logger.warning(f"cannot verify search schema for {table}: {error}")
+
+
+def migrate_asset_table(table: str) -> None:
+    """
+    Add any missing generated columns to a populated asset table, then its
+    search indexes. Each ADD COLUMN rewrites the table and blocks searches and
+    loads on it until done, so run it during a quiet period, not at startup.
+    :param table: The asset/table name
+    :return: None
+    """
+    with table_lock(table):
+        with closing(psycopg2.connect(**local_pg_params())) as conn:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                if not table_exists(cur, table):
+                    logger.info(f"no {table} table to migrate")
+                    return
+                for column, statement in missing_columns(cur, table):
+                    logger.warning(
+                        f"adding {column} column to {table} (rewrites table)"
+                    )
+                    cur.execute(statement.format(table=sql.Identifier(table)))
+                search_columns(cur, table, refresh=True)
+                for index in create_search_indexes(cur, table):
+                    logger.info(f"created search index: {index}")
+
+
+def is_initial_load(table: str) -> bool:
+    """
+    :param table: The asset/table name
+    :return: True if the asset table is empty (or does not exist yet)
+    """
+    ensure_asset_table(table)
+    with closing(psycopg2.connect(**local_pg_params())) as conn:
+        with conn.cursor() as cur:
+            return is_empty(cur, table)
+
+
+def defer_search_indexes(table: str) -> None:
+    """
+    Drop the search indexes before a large initial load; GIN upkeep per row is
+    far slower than one rebuild. Pair with restore_search_indexes.
+    :param table: The asset/table name
+    :return: None
+    """
+    with closing(psycopg2.connect(**local_pg_params())) as conn:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            for index in index_names(table).values():
+                cur.execute(
+                    sql.SQL("DROP INDEX IF EXISTS {}").format(sql.Identifier(index))
+                )
+
+    logger.info(f"deferred search indexes on {table} for initial load")
+
+
+def restore_search_indexes(table: str) -> None:
+    """
+    Rebuild any search indexes missing from the table (i.e. after a deferred
+    initial load)
+    :param table: The asset/table name
+    :return: None
+    """
+    with closing(psycopg2.connect(**local_pg_params())) as conn:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            for index in create_search_indexes(cur, table):
+                logger.info(f"rebuilt search index: {index}")
+
+
+if __name__ == "__main__":
+    # python -m asset.schema [table ...]
+    for asset_table in sys.argv[1:] or ASSET_TABLES:
+        migrate_asset_table(asset_table)
@@ -0,0 +1,90 @@
+"""
+Benchmark search.export.query_to_file on a 1M-row table in the local
+PostgreSQL. Docs mimic well assets: a well subtable, a perfs array and a key
+that only appears late in the result.
+
+Run from the repo root (needs LOCAL_PG_PASS and EXPORT_DIR in .env):
+    python -m bench.export [--rows 1000000] [--formats csv,csv-python,parquet]
+
+csv times the COPY fast path; csv-python (use_copy=False) times the header
+planner and flattening in python.
+
+The bench_export table is dropped afterwards unless --keep is given.
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import psycopg2
+
+from common.typeish import ExportTaskBody
+from common.util import local_pg_params
+from contextlib import closing
+from search.export import query_to_file
+
+TABLE = "bench_export"
+
+CREATE_SQL = f"""
+DROP TABLE IF EXISTS {TABLE};
+CREATE TABLE {TABLE} AS
+SELECT
+    i AS id,
+    jsonb_build_object(
+        'well', jsonb_build_object(
+            'wsn', i,
+            'uwi', lpad(i::text, 14, '42'),
+            'label', 'well ' || i,
+            'elev_kb', round((random() * 3000)::numeric, 1)
+        ) || CASE WHEN i > %(rows)s * 0.9
+            THEN jsonb_build_object('late_key', 'x') ELSE '{{}}'::jsonb END,
+        'perfs', CASE WHEN i %% 2 = 0
+            THEN jsonb_build_array(jsonb_build_object('top', i, 'base', i + 10))
+            ELSE '[]'::jsonb END
+    ) AS doc
+FROM generate_series(1, %(rows)s) AS i;
+ANALYZE {TABLE};
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--formats", default="csv,csv-python,ndjson,parquet")
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    with closing(psycopg2.connect(**local_pg_params())) as conn:
+        conn.autocommit = True
+        t0 = time.perf_counter()
+        with conn.cursor() as cur:
+            cur.execute(CREATE_SQL, {"rows": args.rows})
+        print(f"{TABLE}: {args.rows} rows in {time.perf_counter() - t0:.1f}s")
+
+        try:
+            for variant in args.formats.split(","):
+                file_format = variant.removesuffix("-python")
+                task = ExportTaskBody(
+                    asset="bench",
+                    file_format=file_format,
+                    sql=f"SELECT doc FROM {TABLE}",
+                    total_hits=args.rows,
+                    user_id="bench",
+                    use_copy=variant != "csv-python",
+                )
+                t0 = time.perf_counter()
+                query_to_file(task)
+                elapsed = time.perf_counter() - t0
+                pattern = os.path.join(os.environ.get("EXPORT_DIR"), "bench_*")
+                newest = max(glob.glob(pattern), key=os.path.getmtime)
+                size = os.path.getsize(newest) / 2**20
+                print(f"{variant}: {elapsed:.1f}s, {size:.1f} MiB, {newest}")
+        finally:
+            if not args.keep:
+                with conn.cursor() as cur:
+                    cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+if __name__ == "__main__":
+    main()
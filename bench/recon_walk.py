@@ -0,0 +1,89 @@
+"""
+Benchmark recon.repo_fs.walk_repos against os.walk on a synthetic tree of
+about 110k directories holding 50 Petra-like projects.
+
+Run from the repo root:
+    python -m bench.recon_walk [--root DIR] [--latency 0.001] [--workers 1,16,64]
+
+--latency adds a sleep to every os.scandir call to stand in for an SMB share.
+The tree is built once under --root and reused on later runs.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from recon import repo_fs
+
+PROJECTS = 50
+
+
+def build_tree(root: str) -> None:
+    """
+    100 x 100 x 10 plain directories, plus PROJECTS projects (each with 200
+    DB subdirectories the walker should never enter) and one DB+PARMS
+    directory without an .ini
+    :param root: Where to build the tree
+    :return: None
+    """
+    if os.path.exists(os.path.join(root, "bogus")):
+        return
+    for a in range(100):
+        for b in range(100):
+            for c in range(10):
+                os.makedirs(os.path.join(root, f"a{a}", f"b{b}", f"c{c}"))
+    for p in range(PROJECTS):
+        project = os.path.join(root, f"a{p}", f"b{p}", f"proj{p}")
+        for i in range(200):
+            os.makedirs(os.path.join(project, "DB", f"sub{i}"))
+        os.makedirs(os.path.join(project, "PARMS"))
+        open(os.path.join(project, f"proj{p}.ini"), "w").close()
+        open(os.path.join(project, "DB", "WELL.DAT"), "w").close()
+    os.makedirs(os.path.join(root, "bogus", "DB"))
+    os.makedirs(os.path.join(root, "bogus", "PARMS"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--root", default=os.path.join(tempfile.gettempdir(), "recon_tree")
+    )
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--workers", default="1,16,64")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    build_tree(args.root)
+    print(f"tree ready in {time.perf_counter() - t0:.1f}s: {args.root}")
+
+    real_scandir = os.scandir
+
+    def slow_scandir(path):
+        time.sleep(args.latency)
+        return real_scandir(path)
+
+    if args.latency:
+        os.scandir = slow_scandir
+
+    t0 = time.perf_counter()
+    expected = sorted(
+        os.path.basename(d)
+        for d, _, files in os.walk(args.root)
+        if f"{os.path.basename(d)}.ini" in files
+    )
+    print(f"os.walk: {time.perf_counter() - t0:.2f}s, {len(expected)} projects")
+
+    for workers in [int(w) for w in args.workers.split(",")]:
+        repo_fs.RECON_WALK_WORKERS = workers
+        t0 = time.perf_counter()
+        found = sorted(r["name"] for r in repo_fs.walk_repos(args.root))
+        elapsed = time.perf_counter() - t0
+        assert found == expected, "walk_repos and os.walk disagree"
+        print(f"walk_repos, {workers} workers: {elapsed:.2f}s, {len(found)} projects")
+
+    os.scandir = real_scandir
+
+
+if __name__ == "__main__":
+    main()
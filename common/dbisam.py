@@ -1,15 +1,19 @@
 import pyodbc
 import os
 import re
+from contextlib import contextmanager
 from retry import retry
 from common.logger import Logger
 from common.util import normalize_path, RetryException
 from common.typeish import DBISAMConn
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 
 logger = Logger(__name__)
 
+# rows per fetchmany when streaming
+DB_FETCH_SIZE = 5000
+
 # TODO: make this context aware, use "with..."
 
 
@@ -70,6 +74,44 @@ def db_exec(
         #     connection.close()
 
 
+@contextmanager
+def db_cursor(conn: dict | DBISAMConn) -> Iterator[pyodbc.Cursor]:
+    """
+    A cursor for running several queries on one connection (closed on exit)
+    :param conn: DBISAM connection params
+    :return: A pyodbc cursor
+    """
+    if type(conn) is DBISAMConn:
+        conn = conn.to_dict()
+
+    connection = pyodbc.connect(**conn)
+    cursor = connection.cursor()
+    try:
+        yield cursor
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def stream_rows(
+    cursor: pyodbc.Cursor, sql: str, size: int = DB_FETCH_SIZE
+) -> Iterator[pyodbc.Row]:
+    """
+    Run a query and yield its rows a fetchmany batch at a time, rather than
+    building a list of dicts for the whole result
+    :param cursor: From db_cursor
+    :param sql: A single SQL statement
+    :param size: Rows per fetch
+    :return: Iterator of pyodbc rows (tuple-like)
+    """
+    cursor.execute(sql)
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
+
 def make_conn_params(repo_path: str) -> dict:
     params = {
         "driver": os.environ.get("PETRA_DRIVER"),
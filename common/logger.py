@@ -2,8 +2,6 @@ import logging
 import os
 import sys
 import simplejson as json
-from common.messenger import Messenger
-from common.sb_client import SupabaseClient
 from dotenv import load_dotenv
 
 # CRITICAL
@@ -20,7 +18,9 @@ NAME = "purrio"
 class Logger:
     """
     Move the regular logger instantiation to a singleton class
-    Messenger is
+    Messenger is attached by PurrWorker once it has signed in to supabase, so
+    importing a module (and creating its logger) never touches the network.
+    Until then, send_message only logs.
     """
 
     _instance = None
@@ -60,8 +60,8 @@ class Logger:
         # critical to avoid double-stream to root logger
         self.logger.propagate = False
 
-        self.sb_client = SupabaseClient()
-        self.messenger = Messenger(self.sb_client)
+        # keep a messenger attached by an earlier Logger(...) call
+        self.messenger = getattr(self, "messenger", None)
 
         formatter = logging.Formatter(
             f"%(asctime)s - %(name)s - %(levelname)s - {source} | %(message)s"
@@ -102,10 +102,19 @@ class Logger:
     def exception(self, message):
         self.logger.exception(message)
 
+    def attach_messenger(self, messenger):
+        """
+        Route send_message to supabase via the given (signed in) Messenger
+        :param messenger: A Messenger
+        :return: None
+        """
+        self.messenger = messenger
+
     def send_message(self, directive, repo_id=None, data=None, workflow=None):
         if "note" in data:
             self.logger.info(data["note"])
         else:
             self.logger.info(directive + " " + json.dumps(data))
 
-        self.messenger.send(directive, repo_id, data, workflow)
+        if self.messenger:
+            self.messenger.send(directive, repo_id, data, workflow)
@@ -4,14 +4,14 @@ from supabase import create_client
 
 class SupabaseClient:
     """
-    A simplified proxy for the real supabase client
+    A simplified proxy for the real supabase client. Construction does no
+    network I/O; call sign_in() before using it.
     """
 
     def __init__(self):
         sb_url: str = os.environ.get("SUPABASE_URL")
         sb_key: str = os.environ.get("SUPABASE_KEY")
         self.client = create_client(sb_url, sb_key)
-        self.sign_in()
 
     def sign_in(self):
         sb_email: str = os.environ.get("SUPABASE_EMAIL")
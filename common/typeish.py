@@ -110,6 +110,10 @@ class ReconTaskBody:
     # ggx_host: str
     recon_root: str
     suite: str
+    # recompute every repo, ignoring the recon cache
+    refresh: bool = False
+    # exact, estimate (sampled well counts, refined later by recount tasks)
+    count_mode: str = "exact"
 
     def to_dict(self):
         return asdict(self)
@@ -129,6 +133,29 @@ class ReconTask:
         return task_dict
 
 
+@dataclass
+class RecountTaskBody:
+    repo_id: str
+    suite: str
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass
+class RecountTask:
+    body: RecountTaskBody
+    directive: str
+    id: int
+    status: str
+    worker: str
+
+    def to_dict(self):
+        task_dict = asdict(self)
+        task_dict["body"] = self.body.to_dict()
+        return task_dict
+
+
 # REPO ########################################################################
 # @dataclass
 # class ConnAux:
@@ -167,6 +194,8 @@ class Repo:
     bytes: int
     repo_mod: str
     outline: List[List[float]] = field(default_factory=list)
+    # wells_with_* are sampled estimates (see recon/repo_db.py)
+    counts_estimated: bool = False
     # active: Optional[bool] = True
 
     def to_dict(self):
@@ -185,6 +214,13 @@ class SearchTaskBody:
     suites: List[str]
     user_id: str
     search_id: int
+    count_mode: str = "window"  # window, capped, estimate
+    # asset -> next_page_token from a previous page of this search
+    page_tokens: Dict[str, str] = field(default_factory=dict)
+    # run all assets as one UNION ALL query, hits merged by rank
+    unified: bool = False
+    # EXPLAIN ANALYZE slow queries (see search/profiler.py)
+    profile: bool = False
 
     def to_dict(self):
         return asdict(self)
@@ -212,6 +248,9 @@ class ExportTaskBody:
     sql: str
     total_hits: int
     user_id: str
+    compact: bool = False
+    compression: Optional[str] = None  # gzip, zstd
+    use_copy: bool = True  # csv only: COPY ... TO STDOUT fast path
 
     def to_dict(self):
         return asdict(self)
@@ -269,6 +308,7 @@ def validate_repo(payload: dict):
         bytes=payload["bytes"],
         repo_mod=payload["repo_mod"],
         outline=payload["outline"],
+        counts_estimated=payload.get("counts_estimated", False),
     )
 
 
@@ -353,6 +393,15 @@ def validate_task(payload: dict):
                         worker=task["worker"],
                     )
 
+                if task.get("directive") == "recount":
+                    return RecountTask(
+                        body=RecountTaskBody(**task["body"]),
+                        directive=task["directive"],
+                        id=task["id"],
+                        status=task["status"],
+                        worker=task["worker"],
+                    )
+
                 if task.get("directive") == "search":
                     # NOTE: task.body.search_id = task.id
                     task["body"]["search_id"] = task["id"]
@@ -2,19 +2,26 @@ import os
 import simplejson as json
 import sys
 import threading
+import time
 from dotenv import load_dotenv
 
 from asset.batcher import batcher
 from asset.loader import loader
+from asset.schema import (
+    ensure_asset_schema,
+    is_initial_load,
+    defer_search_indexes,
+    restore_search_indexes,
+    FTS_DEFER_INDEX_TASKS,
+)
 
 from common.sb_client import SupabaseClient
 from common.messenger import Messenger
 from common.queue_manager import QueueManager
 from common.task_manager import TaskManager
 from common.typeish import validate_task, validate_repo, Repo
-from common.util import init_socket, hostname, SUITE
-from recon.recon import repo_recon
-from search.search import search_local_pg, query_to_file
+from common.util import init_socket, hostname, normalize_path, SUITE
+from search.search import search_local_pg
 from common.logger import Logger
 
 from typing import Any, Callable, Dict, List
@@ -29,6 +36,8 @@ def handle_export(task):
     :param task: ExportTaskBody
     :return: None
     """
+    from search.export import query_to_file
+
     logger.send_message(directive="busy", data={"job_id": task.id})
     query_to_file(task.body)
     logger.send_message(directive="done", data={"job_id": task.id})
@@ -39,9 +48,12 @@ def handle_export(task):
 class PurrWorker:
 
     def __init__(self) -> None:
+        # the one network sign-in; the logger sends messages from here on
         self.sb_client = SupabaseClient()
+        self.sb_client.sign_in()
         self.task_manager = TaskManager(self.sb_client)
         self.messenger = Messenger(self.sb_client)
+        logger.attach_messenger(self.messenger)
 
         work_max_workers = int(os.environ.get("WORK_MAX_WORKERS"))
         self.work_queue = QueueManager(work_max_workers)
@@ -61,6 +73,10 @@ class PurrWorker:
         self.socket = init_socket()
         self.running = True
 
+        # verify asset tables and build missing search indexes in the
+        # background (concurrently); startup does not wait for it
+        threading.Thread(target=ensure_asset_schema, daemon=True).start()
+
         logger.info(f"PurrWorker ({SUITE}) initialized...")
 
     def register_worker(self):
@@ -140,6 +156,10 @@ class PurrWorker:
             print("nothing here, man")
             return "nothing here"
 
+        # 3a. big initial loads rebuild search indexes once, at the end
+        if len(tasks) >= FTS_DEFER_INDEX_TASKS and is_initial_load(task.body.asset):
+            defer_search_indexes(task.body.asset)
+
         # 4. enqueue batch of tasks (and get ids from return)
         upres = self.sb_client.table("task").upsert(tasks).execute()
 
@@ -197,6 +217,9 @@ class PurrWorker:
         done = self.task_manager.is_batch_finished(task.body.batch_id)
 
         if done:
+            # 4a. rebuild search indexes if they were deferred
+            restore_search_indexes(task.body.asset)
+
             # 5. notify client of job/task end
             logger.send_message(directive="done", data={"job_id": task.body.batch_id})
 
@@ -213,25 +236,128 @@ class PurrWorker:
         :param task: An instance of ReconTask
         :return: TODO
         """
+        # recon (numpy, concave_hull, EPSG tables) loads on first use
+        from recon.cache import ReconCheckpoint, RECON_CHECKPOINT_FILE
+        from recon.recon import iter_recon, RECON_UPSERT_BATCH, RECON_UPSERT_SECONDS
 
         # 0. notify client of job/task start
         logger.send_message(directive="busy", data={"job_id": task.id})
 
-        # 1. run repo_recon (returned as dicts for supabase)
-        repos: List[Dict[str, Any]] = repo_recon(task.body)
-
-        # 2. write repos to repo table
-        self.sb_client.table("repo").upsert(repos).execute()
-
-        # 3. send message
-        for repo in repos:
+        # 1. resume after any repos an interrupted recon of this root upserted
+        checkpoint = ReconCheckpoint(
+            RECON_CHECKPOINT_FILE, normalize_path(task.body.recon_root)
+        )
+        # a forced refresh redoes every repo
+        if task.body.refresh:
+            checkpoint.clear()
+        resumed = len(checkpoint.done)
+        if resumed:
             logger.send_message(
                 directive="note",
-                repo_id=repo["id"],
-                data={"note": f"added repo: {repo["fs_path"]}"},
+                data={"note": f"resuming recon, skipping {resumed} repos"},
                 workflow="recon",
             )
 
+        # 2. upsert repos in small batches as their recon finishes (repos are
+        # reconned concurrently), checkpointing each batch
+        batch: List[Dict[str, Any]] = []
+        recount_ids: List[str] = []
+        added = 0
+        flushed_at = time.monotonic()
+
+        def flush() -> None:
+            nonlocal batch, added, flushed_at
+            if batch:
+                self.sb_client.table("repo").upsert(batch).execute()
+                recount_ids.extend(
+                    repo["id"] for repo in batch if repo.get("counts_estimated")
+                )
+                checkpoint.mark([repo["id"] for repo in batch])
+                for repo in batch:
+                    logger.send_message(
+                        directive="note",
+                        repo_id=repo["id"],
+                        data={"note": f"added repo: {repo["fs_path"]}"},
+                        workflow="recon",
+                    )
+                added += len(batch)
+                batch = []
+            flushed_at = time.monotonic()
+
+        # iter_recon yields None while nothing finishes, so the timer still fires
+        timeout = min(1.0, RECON_UPSERT_SECONDS)
+        for repo in iter_recon(task.body, skip=set(checkpoint.done), timeout=timeout):
+            if repo:
+                batch.append(repo)
+            if (
+                len(batch) >= RECON_UPSERT_BATCH
+                or time.monotonic() - flushed_at >= RECON_UPSERT_SECONDS
+            ):
+                flush()
+        flush()
+        checkpoint.clear()
+
+        # estimated counts get an exact recount, queued only now so that the
+        # recounts (of the largest repos) don't compete with the recon itself
+        if recount_ids:
+            recounts = [
+                {
+                    "worker": hostname(),
+                    "directive": "recount",
+                    "status": "PENDING",
+                    "body": {"repo_id": repo_id, "suite": SUITE},
+                }
+                for repo_id in recount_ids
+            ]
+            self.sb_client.table("task").insert(recounts).execute()
+
+        # 3. send message
+        logger.send_message(
+            directive="note",
+            data={"note": f"recon found {added + resumed} repos"},
+            workflow="recon",
+        )
+
+        # 4. notify client of job/task end
+        logger.send_message(directive="done", data={"job_id": task.id})
+
+        return True
+
+    ###########################################################################
+
+    def handle_recount(self, task):
+        """
+        Replace a repo's estimated well counts (from a count_mode="estimate"
+        recon) with exact ones. The recon cache entry is refreshed too if the
+        repo has not changed since.
+        :param task: An instance of RecountTask
+        :return: TODO
+        """
+        from recon.cache import recon_cache, repo_fingerprint
+        from recon.repo_db import well_counts
+
+        # 0. notify client of job/task start
+        logger.send_message(directive="busy", data={"job_id": task.id})
+
+        # 1. get associated repo
+        repo: Repo = self.fetch_repo(task.body)
+
+        # 2. exact counts
+        counts = well_counts(repo.to_dict())
+        self.sb_client.table("repo").update(counts).eq("id", repo.id).execute()
+
+        # 3. keep the recon cache in step
+        cache = recon_cache()
+        if cache.update(repo.id, repo_fingerprint(repo.fs_path), counts):
+            cache.save()
+
+        logger.send_message(
+            directive="note",
+            repo_id=repo.id,
+            data={"note": f"exact well counts @ {repo.fs_path}"},
+            workflow="recon",
+        )
+
         # 4. notify client of job/task end
         logger.send_message(directive="done", data={"job_id": task.id})
 
@@ -268,6 +394,7 @@ class PurrWorker:
             "batcher": self.handle_batcher,
             "loader": self.handle_loader,
             "recon": self.handle_recon,
+            "recount": self.handle_recount,
             "search": self.handle_search,
             "export": handle_export,
             # "stats": self.handle_stats,
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import threading
+
+from dotenv import load_dotenv
+from common.logger import Logger
+from typing import Any, Dict, List, Optional
+
+load_dotenv()
+logger = Logger(__name__)
+
+# where recon results persist between runs
+RECON_CACHE_FILE = os.environ.get("RECON_CACHE_FILE") or "recon_cache.json"
+
+# repos already published by an unfinished recon, per recon root
+RECON_CHECKPOINT_FILE = (
+    os.environ.get("RECON_CHECKPOINT_FILE") or "recon_checkpoint.json"
+)
+
+
+def list_stats(path: str, suffix: str = "") -> List[list]:
+    """
+    :param path: A directory path
+    :param suffix: Only files ending with this (case-insensitive)
+    :return: Sorted [name, size, mtime_ns] of the directory's files
+    """
+    stats = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(suffix) and entry.is_file():
+                    stat = entry.stat()
+                    stats.append([entry.name.lower(), stat.st_size, stat.st_mtime_ns])
+    except OSError:
+        pass
+    return sorted(stats)
+
+
+def repo_fingerprint(fs_path: str) -> str:
+    """
+    A cheap change detector for a Petra project: names, sizes and mtimes of
+    DB/*.DAT, the PARMS files and the project .ini (no file contents are read)
+    :param fs_path: The project directory
+    :return: An md5 hex digest
+    """
+    ini = os.path.join(fs_path, f"{os.path.basename(fs_path)}.ini")
+    try:
+        stat = os.stat(ini)
+        ini_stat = [stat.st_size, stat.st_mtime_ns]
+    except OSError:
+        ini_stat = None
+
+    parts = {
+        "db": list_stats(os.path.join(fs_path, "DB"), ".dat"),
+        "parms": list_stats(os.path.join(fs_path, "PARMS")),
+        "ini": ini_stat,
+    }
+    return hashlib.md5(json.dumps(parts).encode()).hexdigest()
+
+
+class ReconCache:
+    """
+    Recon metadata per repo id plus the fingerprint it was computed from,
+    persisted as a JSON file. A repo whose fingerprint has not changed can
+    skip well counts, hull, EPSG and dir stats.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        try:
+            with open(path, "r") as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as error:
+            logger.warning(f"ignoring unreadable recon cache {path}: {error}")
+
+    def get(self, repo_id: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        :param repo_id: Repo id
+        :param fingerprint: The repo's current repo_fingerprint
+        :return: The cached repo dict, or None if missing or stale
+        """
+        with self.lock:
+            entry = self.entries.get(repo_id)
+        if entry and entry["fingerprint"] == fingerprint:
+            return entry["repo"]
+        return None
+
+    def put(self, repo_id: str, fingerprint: str, repo: Dict[str, Any]) -> None:
+        with self.lock:
+            self.entries[repo_id] = {"fingerprint": fingerprint, "repo": repo}
+            self.dirty = True
+
+    def update(self, repo_id: str, fingerprint: str, values: Dict[str, Any]) -> bool:
+        """
+        Merge values into a cached repo, if its entry is still current
+        :param repo_id: Repo id
+        :param fingerprint: The repo's current repo_fingerprint
+        :param values: Repo fields to replace (i.e. exact well counts)
+        :return: True if the entry was updated
+        """
+        with self.lock:
+            entry = self.entries.get(repo_id)
+            if not entry or entry["fingerprint"] != fingerprint:
+                return False
+            entry["repo"] = {**entry["repo"], **values}
+            self.dirty = True
+            return True
+
+    def save(self) -> None:
+        """
+        Write the cache (if changed) via a temp file, so an interrupted write
+        cannot corrupt it
+        :return: None
+        """
+        with self.lock:
+            if not self.dirty:
+                return
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.entries, f, default=str)
+            os.replace(tmp, self.path)
+            self.dirty = False
+
+
+_caches: Dict[str, ReconCache] = {}
+_caches_lock = threading.Lock()
+
+# recons of different roots may write the checkpoint file concurrently
+_checkpoint_lock = threading.Lock()
+
+
+def recon_cache(path: str = RECON_CACHE_FILE) -> ReconCache:
+    """
+    The process-wide ReconCache for a file. Recons and recounts share it, so
+    one task's save() cannot drop another's entries.
+    :param path: The cache file
+    :return: A ReconCache, loaded on first use
+    """
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = ReconCache(path)
+        return _caches[path]
+
+
+class ReconCheckpoint:
+    """
+    The ids of repos already upserted by a recon of recon_root, persisted after
+    every batch. A recon that dies part way can be restarted and skip them; a
+    recon that finishes clears its checkpoint. Recons of other roots may share
+    the file, so each write re-reads it and replaces only this root's entry.
+    """
+
+    def __init__(self, path: str, recon_root: str):
+        self.path = path
+        self.recon_root = recon_root
+        with _checkpoint_lock:
+            self.done = set(self.read().get(recon_root, []))
+
+    def read(self) -> Dict[str, List[str]]:
+        """
+        :return: Dict of recon root -> upserted repo ids, from the file
+        """
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            logger.warning(f"ignoring unreadable recon checkpoint {self.path}: {error}")
+            return {}
+
+    def mark(self, repo_ids: List[str]) -> None:
+        """
+        Record published repos and rewrite the checkpoint file
+        :param repo_ids: Ids of the repos just upserted
+        :return: None
+        """
+        self.done.update(repo_ids)
+        with _checkpoint_lock:
+            roots = self.read()
+            roots[self.recon_root] = sorted(self.done)
+            self.write(roots)
+
+    def clear(self) -> None:
+        """
+        Forget this recon root (the recon finished, or is a forced refresh)
+        :return: None
+        """
+        self.done = set()
+        with _checkpoint_lock:
+            roots = self.read()
+            if roots.pop(self.recon_root, None) is not None:
+                self.write(roots)
+
+    def write(self, roots: Dict[str, List[str]]) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(roots, f)
+        os.replace(tmp, self.path)
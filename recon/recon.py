@@ -1,36 +1,173 @@
 # from recon.repo_fs import glob_repos, dir_stats, repo_mod
-from recon.repo_db import well_counts, hull_outline
+from recon.repo_db import well_counts, estimate_well_counts, hull_outline
+
 # from recon.epsg import epsg_codes
 
-from recon.repo_fs import glob_repos, dir_stats, repo_mod
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from recon.cache import ReconCache, recon_cache, repo_fingerprint, RECON_CACHE_FILE
+from recon.repo_fs import walk_repos, dir_stats
 from recon.epsg import epsg_codes
+from common.logger import Logger
 from common.util import normalize_path
 from common.typeish import validate_repo
-from typing import Dict, List, Any
+from typing import Dict, Iterator, Any, Optional, Set
 
 # from common.debugger import debugger
 
+load_dotenv()
+logger = Logger(__name__)
+
+# repos reconned concurrently
+RECON_REPO_WORKERS = int(os.environ.get("RECON_REPO_WORKERS") or 4)
+
+# the recon cache is written after this many finished repos (and at the end)
+RECON_CACHE_SAVE_EVERY = int(os.environ.get("RECON_CACHE_SAVE_EVERY") or 10)
+
+# finished repos are upserted once this many are waiting, or this often
+RECON_UPSERT_BATCH = int(os.environ.get("RECON_UPSERT_BATCH") or 5)
+RECON_UPSERT_SECONDS = float(os.environ.get("RECON_UPSERT_SECONDS") or 30)
+
+# iter_recon bookkeeping message: walk_repos is done and all repos submitted
+WALK_FINISHED = object()
+
+
+def recon_repo(
+    repo_base: dict,
+    fs_executor: ThreadPoolExecutor,
+    cache: ReconCache,
+    refresh: bool = False,
+    count_mode: str = "exact",
+) -> Dict[str, Any]:
+    """
+    Collect one repo's metadata, or reuse the cached result if the repo's
+    fingerprint is unchanged (unless refresh). The filesystem step (dir_stats)
+    runs on its own pool while the DB steps run here, so the two kinds of I/O
+    overlap.
+    :param repo_base: A stub repo dict from walk_repos
+    :param fs_executor: Pool for the filesystem step
+    :param cache: The ReconCache
+    :param refresh: Recompute even if the cached result is current
+    :param count_mode: exact, or estimate to sample large projects' counts
+    :return: The repo as a validated dict
+    """
+    fingerprint = repo_fingerprint(repo_base["fs_path"])
+    estimate = count_mode == "estimate"
+
+    cached = None if refresh else cache.get(repo_base["id"], fingerprint)
+    # estimated counts don't satisfy an exact recon
+    if cached and (estimate or not cached.get("counts_estimated")):
+        logger.debug(f"recon cache hit: {repo_base["fs_path"]}")
+        return validate_repo({**cached, **repo_base}).to_dict()
+
+    fs_future = fs_executor.submit(dir_stats, repo_base)
+
+    for func in [
+        estimate_well_counts if estimate else well_counts,
+        hull_outline,
+        epsg_codes,
+    ]:
+        md = func(repo_base)
+        repo_base.update(md)
+
+    repo_base.update(fs_future.result())
+    repo = validate_repo(repo_base).to_dict()
+    cache.put(repo_base["id"], fingerprint, repo)
+    return repo
+
 
-def repo_recon(body) -> List[Dict[str, Any]]:
+def iter_recon(
+    body, skip: Optional[Set[str]] = None, timeout: Optional[float] = None
+) -> Iterator[Optional[Dict[str, Any]]]:
     """
+    Recon up to RECON_REPO_WORKERS repos at a time, starting each as soon as
+    walk_repos finds it, and yield each repo as it finishes. The walk runs on
+    its own thread, so a finished repo is yielded right away even while the
+    walk is still searching (which can take a while on a network share). A
+    repo that fails is logged and skipped. Unchanged repos come from the recon
+    cache unless body.refresh is set. The cache is saved every
+    RECON_CACHE_SAVE_EVERY repos so that work done before a crash is not lost.
     :param body: A ReconTaskBody
-    :return: A list of valid Repo classes having all expected Repo elements.
-    Repo classes are turned back to dicts since they are going into supabase.
+    :param skip: Ids of repos to leave out (i.e. from a ReconCheckpoint)
+    :param timeout: If set, None is yielded whenever no repo finished for this
+        many seconds, so the consumer can act on a timer (i.e. flush upserts)
+    :return: Iterator of valid Repo dicts, in completion order
     """
     fs_path = normalize_path(body.recon_root)
+    skip = skip or set()
+
+    cache = recon_cache(RECON_CACHE_FILE)
+    results = queue.Queue()
+    stop = threading.Event()
+    walk = {"submitted": 0, "error": None}
+
+    def discover(executor, fs_executor):
+        repo_bases = walk_repos(fs_path, stop)
+        try:
+            for repo_base in repo_bases:
+                if stop.is_set():
+                    break
+                if repo_base["id"] in skip:
+                    continue
+                future = executor.submit(
+                    recon_repo,
+                    repo_base,
+                    fs_executor,
+                    cache,
+                    body.refresh,
+                    body.count_mode,
+                )
+                walk["submitted"] += 1
+                future.add_done_callback(results.put)
+        except Exception as error:
+            # submit fails once the consumer has stopped early; that's not news
+            if not stop.is_set():
+                walk["error"] = error
+        finally:
+            repo_bases.close()
+            results.put(WALK_FINISHED)
+
+    collected = 0
+    walked = False
+    try:
+        with ThreadPoolExecutor(max_workers=RECON_REPO_WORKERS) as executor:
+            with ThreadPoolExecutor(max_workers=RECON_REPO_WORKERS) as fs_executor:
+                walker = threading.Thread(
+                    target=discover, args=(executor, fs_executor), daemon=True
+                )
+                walker.start()
+                try:
+                    while not walked or collected < walk["submitted"]:
+                        try:
+                            result = results.get(timeout=timeout)
+                        except queue.Empty:
+                            yield None
+                            continue
+
+                        if result is WALK_FINISHED:
+                            walked = True
+                            if walk["error"]:
+                                raise walk["error"]
+                            continue
 
-    repos = glob_repos(fs_path)
-
-    for repo_base in repos:
-        for func in [
-            well_counts,
-            hull_outline,
-            epsg_codes,
-            dir_stats,
-            repo_mod,
-        ]:
-            md = func(repo_base)
-            repo_base.update(md)
-
-    validated_repo_dicts = [validate_repo(r).to_dict() for r in repos]
-    return validated_repo_dicts
+                        collected += 1
+                        try:
+                            repo = result.result()
+                        except Exception as error:
+                            logger.exception(error)
+                            continue
+                        if collected % RECON_CACHE_SAVE_EVERY == 0:
+                            cache.save()
+                        yield repo
+                finally:
+                    # if the consumer stopped early, stop walking and drop
+                    # queued repos before the executors wait on running ones
+                    stop.set()
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    fs_executor.shutdown(wait=False, cancel_futures=True)
+                    walker.join()
+    finally:
+        cache.save()
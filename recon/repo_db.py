@@ -1,12 +1,17 @@
-from common.dbisam import db_exec
+import numpy as np
+import os
+
+from common.dbisam import db_cursor, stream_rows, DB_FETCH_SIZE
 from common.logger import Logger
-from concave_hull import concave_hull
+from dotenv import load_dotenv
 
 # from common.debugger import debugger
 
 # DBISAM cannot do COUNT(DISTINCT *) and suggests using memory tables as an
-# alternative. Watch out for "11013 Access denied" errors.
-# (We could use the ODBC result's rowCount as a (horrible) alternative)
+# alternative. Instead, each query below streams the distinct wsn of wells
+# having a data type, and well_counts intersects those sets with the wells
+# in the well table client-side (the same as joining to well). Every table is
+# read once, with no memory tables (no "11013 Access denied" errors).
 
 
 NOTNULL_LONLAT = (
@@ -17,35 +22,30 @@ NOTNULL_LONLAT = (
 
 HULL_CONCAVITY = 2
 
+# wells are thinned to one point per grid cell of this size (degrees)
+HULL_GRID_TOLERANCE = float(os.environ.get("HULL_GRID_TOLERANCE") or 0.001)
+
+# the grid is coarsened until at most this many points reach concave_hull
+HULL_MAX_POINTS = int(os.environ.get("HULL_MAX_POINTS") or 20000)
+
+# |lon| and |lat| both below this are treated as bogus 0,0 locations
+HULL_ZERO_EPSILON = 1e-6
+
 ##########
 
-WELLS = (
-    r"DROP TABLE IF EXISTS memory\temp;"
-    r"SELECT DISTINCT(w.wsn) INTO memory\temp FROM well w;"
-    r"SELECT COUNT(*) AS tally from memory\temp;"
-)
+WELLS = "SELECT DISTINCT wsn FROM well"
 
 # WELLS_WITH_COMPLETION = "SELECT COUNT(DISTINCT uwi) AS tally FROM well_completion"
 # TODO: figure out how to deal with completion/perforation
 
 
 # Select | Wells By Data Criteria | Mechanical | Cored Intervals | Any Cores
-WELLS_WITH_CORE = (
-    r"DROP TABLE IF EXISTS memory\temp;"
-    r"SELECT DISTINCT(c.wsn) INTO memory\temp "
-    r"FROM cores c JOIN well w ON c.wsn = w.wsn;"
-    r"SELECT COUNT(*) AS tally from memory\temp;"
-)
+WELLS_WITH_CORE = "SELECT DISTINCT wsn FROM cores"
 
 # NOTE: Regarding DST: within Petra, doing
 # [ Select | Wells By Data Criteria | Tests | Any Formation Tests (DST) ]
 # yields a slightly higher count. It doesn't use f.testtype = 'D' clause?
-WELLS_WITH_DST = (
-    r"DROP TABLE IF EXISTS memory\temp;"
-    r"SELECT DISTINCT(w.wsn) INTO memory\temp FROM well w "
-    r"JOIN fmtest f ON f.wsn = w.wsn AND f.testtype = 'D';"
-    r"SELECT COUNT(*) AS tally from memory\temp;"
-)
+WELLS_WITH_DST = "SELECT DISTINCT wsn FROM fmtest WHERE testtype = 'D'"
 
 # Select | Wells By Data Criteria | Geology (Tops) | Tops Data |
 # (pick All formations on left)
@@ -53,72 +53,42 @@ WELLS_WITH_DST = (
 # Requirements: If Top is Present in the Database
 # ...otherwise you get a bunch of tops with no data.
 WELLS_WITH_FORMATION = (
-    r"DROP TABLE IF EXISTS memory\temp;"
-    r"SELECT DISTINCT(w.wsn) INTO memory\temp FROM zflddef f "
-    r"JOIN zdata z ON f.fid = z.fid "
-    r"AND f.kind = 'T' "
-    r"AND z.zid = 1 "
-    r"AND z.z < 1E30 "
-    r"AND z.z IS NOT NULL "
-    r"JOIN well w ON z.wsn = w.wsn;"
-    r"SELECT COUNT(*) AS tally from memory\temp;"
+    "SELECT DISTINCT z.wsn FROM zflddef f "
+    "JOIN zdata z ON f.fid = z.fid "
+    "AND f.kind = 'T' "
+    "AND z.zid = 1 "
+    "AND z.z < 1E30 "
+    "AND z.z IS NOT NULL"
 )
 
 # Select | Wells By Data Criteria | Tests | Any Production Tests (IP)
-WELLS_WITH_IP = (
-    r"DROP TABLE IF EXISTS memory\temp;"
-    r"SELECT DISTINCT(w.wsn) INTO memory\temp FROM well w "
-    r"JOIN pdtest p ON p.wsn = w.wsn;"
-    r"SELECT COUNT(*) AS tally from memory\temp;"
-)
+WELLS_WITH_IP = "SELECT DISTINCT wsn FROM pdtest"
 
 # Select | Wells By Data Criteria | Mechanical | Any Perfs
-WELLS_WITH_PERFORATION = (
-    r"DROP TABLE IF EXISTS memory\temp;"
-    r"SELECT DISTINCT(w.wsn) INTO memory\temp FROM well w "
-    r"JOIN perfs p ON p.wsn = w.wsn;"
-    r"SELECT COUNT(*) AS tally from memory\temp;"
-)
+WELLS_WITH_PERFORATION = "SELECT DISTINCT wsn FROM perfs"
 
 # Select | Wells By Data Criteria | Production |
 # (one-doc-per-mopddef.fid)
-WELLS_WITH_PRODUCTION = (
-    r"DROP TABLE IF EXISTS memory\temp;"
-    r"SELECT DISTINCT(w.wsn) INTO memory\temp FROM well w "
-    r"JOIN mopddata a ON a.wsn = w.wsn;"
-    r"SELECT COUNT(*) AS tally from memory\temp;"
-)
+WELLS_WITH_PRODUCTION = "SELECT DISTINCT wsn FROM mopddata"
 
 # TODO: confirm counts (there was variance in test proj 6669 vs 6672)
 # Select | Wells By Data Criteria | Logs | Raster Logs | Calibrated Rasters
 # (Find Wells With ANY Rasters)
-WELLS_WITH_RASTER_LOG = (
-    r"DROP TABLE IF EXISTS memory\temp;"
-    r"SELECT DISTINCT(w.wsn) INTO memory\temp FROM well w "
-    r"JOIN logimage i ON w.wsn = i.wsn;"
-    r"SELECT COUNT(*) AS tally from memory\temp;"
-)
+WELLS_WITH_RASTER_LOG = "SELECT DISTINCT wsn FROM logimage"
 
 # Select | Wells By Data Criteria | Locations | Wells with Directional Survey
 # When ANY Condition is Met
 WELLS_WITH_SURVEY = (
-    r"DROP TABLE IF EXISTS memory\temp;"
-    r"SELECT DISTINCT(w.wsn) INTO memory\temp FROM well w "
-    r"JOIN dirsurvdata d ON d.wsn = w.wsn "
-    r"JOIN dirsurvdef f ON f.survrecid = d.survrecid "
-    r"GROUP BY w.wsn;"
-    r"SELECT COUNT(*) AS tally from memory\temp;"
+    "SELECT DISTINCT d.wsn FROM dirsurvdata d "
+    "JOIN dirsurvdef f ON f.survrecid = d.survrecid"
 )
 
 # Select | Wells By Data Criteria | Logs | Digtial Logs | Log Curves
 # Any Curves At All
 WELLS_WITH_VECTOR_LOG = (
-    r"DROP TABLE IF EXISTS memory\temp;"
-    r"SELECT DISTINCT(w.wsn) INTO memory\temp FROM well w "
-    r"JOIN logdata a ON w.wsn = a.wsn "
-    r"JOIN logdef f ON a.lsn = f.lsn "
-    r"JOIN logdatax x ON a.wsn = x.wsn AND a.lsn = x.lsn AND a.ldsn = x.ldsn;"
-    r"SELECT COUNT(*) AS tally from memory\temp;"
+    "SELECT DISTINCT a.wsn FROM logdata a "
+    "JOIN logdef f ON a.lsn = f.lsn "
+    "JOIN logdatax x ON a.wsn = x.wsn AND a.lsn = x.lsn AND a.ldsn = x.ldsn"
 )
 
 # Select | Wells By Data Criteria | Zones | Zone or Tops Data
@@ -126,24 +96,52 @@ WELLS_WITH_VECTOR_LOG = (
 # Zone and Item individually
 # * Probably. I tested a few, but it's too much of a pain.
 WELLS_WITH_ZONE = (
-    r"DROP TABLE IF EXISTS memory\temp;"
-    r"SELECT DISTINCT(w.wsn) INTO memory\temp FROM WELL w "
-    r"JOIN zdata z ON z.wsn = w.wsn "
-    r"JOIN zonedef n ON n.zid = z.zid AND n.kind > 2 "
-    r"JOIN zflddef f ON f.zid = n.zid AND f.fid = z.fid;"
-    r"SELECT COUNT(*) AS tally from memory\temp;"
+    "SELECT DISTINCT z.wsn FROM zdata z "
+    "JOIN zonedef n ON n.zid = z.zid AND n.kind > 2 "
+    "JOIN zflddef f ON f.zid = n.zid AND f.fid = z.fid"
 )
 
+# data type -> (distinct wsn query, its wsn column for sampled ranges)
+COUNTER_SQL = {
+    # "wells_with_completion": (WELLS_WITH_COMPLETION, "wsn"),
+    "wells_with_core": (WELLS_WITH_CORE, "wsn"),
+    "wells_with_dst": (WELLS_WITH_DST, "wsn"),
+    "wells_with_formation": (WELLS_WITH_FORMATION, "z.wsn"),
+    "wells_with_ip": (WELLS_WITH_IP, "wsn"),
+    "wells_with_perforation": (WELLS_WITH_PERFORATION, "wsn"),
+    "wells_with_production": (WELLS_WITH_PRODUCTION, "wsn"),
+    "wells_with_raster_log": (WELLS_WITH_RASTER_LOG, "wsn"),
+    "wells_with_survey": (WELLS_WITH_SURVEY, "d.wsn"),
+    "wells_with_vector_log": (WELLS_WITH_VECTOR_LOG, "a.wsn"),
+    "wells_with_zone": (WELLS_WITH_ZONE, "z.wsn"),
+}
+
+load_dotenv()
+logger = Logger(__name__)
 
+# estimate mode: wells sampled per project (smaller projects get exact counts)
+RECON_COUNT_SAMPLE = int(os.environ.get("RECON_COUNT_SAMPLE") or 5000)
 
-logger = Logger(__name__)
+# estimate mode: the sample is this many wsn ranges spread across the project
+RECON_COUNT_RANGES = int(os.environ.get("RECON_COUNT_RANGES") or 8)
+
+
+def count_matches(cursor, wells: set, query: str) -> int:
+    """
+    :param cursor: From db_cursor
+    :param wells: Distinct wsn of the well table
+    :param query: A distinct wsn query
+    :return: How many of its wsn are in wells
+    """
+    return len(wells.intersection(r[0] for r in stream_rows(cursor, query)))
 
 
 def well_counts(repo_base) -> dict:
     """
-    Run a bunch of SQL counts for wells having each data type. Note that this
-    is well-centric. For example, it's wells with raster logs, not a count of
-    raster logs.
+    Count the wells having each data type. Note that this is well-centric. For
+    example, it's wells with raster logs, not a count of raster logs. Every
+    query returns distinct wsn, so a well counts once per data type if its
+    wsn is also in the well table. One connection serves all the queries.
     :param repo_base: A stub repo dict. We just use the fs_path
     :return: dict with each count, named after the keys below
     """
@@ -154,31 +152,150 @@ def well_counts(repo_base) -> dict:
         workflow="recon",
     )
 
-    counter_sql = {
-        "well_count": WELLS,
-        # "wells_with_completion": WELLS_WITH_COMPLETION,
-        "wells_with_core": WELLS_WITH_CORE,
-        "wells_with_dst": WELLS_WITH_DST,
-        "wells_with_formation": WELLS_WITH_FORMATION,
-        "wells_with_ip": WELLS_WITH_IP,
-        "wells_with_perforation": WELLS_WITH_PERFORATION,
-        "wells_with_production": WELLS_WITH_PRODUCTION,
-        "wells_with_raster_log": WELLS_WITH_RASTER_LOG,
-        "wells_with_survey": WELLS_WITH_SURVEY,
-        "wells_with_vector_log": WELLS_WITH_VECTOR_LOG,
-        "wells_with_zone": WELLS_WITH_ZONE,
-    }
+    with db_cursor(repo_base["conn"]) as cursor:
+        wells = {row[0] for row in stream_rows(cursor, WELLS)}
+        wells.discard(None)
 
-    res = db_exec(repo_base["conn"], list(counter_sql.values()))
+        counts = {"well_count": len(wells), "counts_estimated": False}
 
-    counts = {}
+        for k, (query, _) in COUNTER_SQL.items():
+            counts[k] = count_matches(cursor, wells, query)
+
+    return counts
 
-    for i, k in enumerate(counter_sql.keys()):
-        counts[k] = res[i][0]["tally"] or 0
+
+def sample_ranges(wsns: list, sample: int, ranges: int) -> list:
+    """
+    Pick `ranges` runs of consecutive wsn, one from the middle of each equal
+    slice of the sorted wsn list, totalling about `sample` wells
+    :param wsns: Sorted, distinct wsn of the well table
+    :param sample: Wells to sample
+    :param ranges: Number of runs
+    :return: List of (first wsn, last wsn, wells in run)
+    """
+    n = len(wsns)
+    run = max(1, sample // ranges)
+    result = []
+    for i in range(ranges):
+        lo, hi = n * i // ranges, n * (i + 1) // ranges
+        start = lo + max(0, (hi - lo - run) // 2)
+        stop = min(hi, start + run)
+        if stop > start:
+            result.append((wsns[start], wsns[stop - 1], stop - start))
+    return result
+
+
+def estimate_well_counts(repo_base) -> dict:
+    """
+    A fast alternative to well_counts for very large projects. well_count is
+    exact, but each wells_with_* count is extrapolated from RECON_COUNT_RANGES
+    wsn ranges totalling RECON_COUNT_SAMPLE wells, so the big joins (i.e.
+    logdata/logdatax) only read the sampled wells. Projects no bigger than
+    the sample get exact counts. A recount task can refine estimates later.
+    :param repo_base: A stub repo dict. We just use the fs_path
+    :return: dict with each count plus counts_estimated
+    """
+    with db_cursor(repo_base["conn"]) as cursor:
+        wells = {row[0] for row in stream_rows(cursor, WELLS)}
+        wells.discard(None)
+
+        estimated = len(wells) > RECON_COUNT_SAMPLE
+        verb = "estimating" if estimated else "collecting"
+        logger.send_message(
+            directive="note",
+            repo_id=repo_base["id"],
+            data={"note": f"{verb} well counts @ {repo_base["fs_path"]}"},
+            workflow="recon",
+        )
+
+        counts = {"well_count": len(wells), "counts_estimated": estimated}
+
+        if not estimated:
+            for k, (query, _) in COUNTER_SQL.items():
+                counts[k] = count_matches(cursor, wells, query)
+            return counts
+
+        runs = sample_ranges(sorted(wells), RECON_COUNT_SAMPLE, RECON_COUNT_RANGES)
+        sampled = sum(size for _, _, size in runs)
+
+        for k, (query, column) in COUNTER_SQL.items():
+            hits = 0
+            for first, last, _ in runs:
+                clause = "AND" if " WHERE " in query else "WHERE"
+                ranged = (
+                    f"{query} {clause} {column} BETWEEN {int(first)} AND {int(last)}"
+                )
+                hits += count_matches(cursor, wells, ranged)
+            counts[k] = round(hits / sampled * len(wells))
 
     return counts
 
 
+def valid_lonlat(points: np.ndarray) -> np.ndarray:
+    """
+    Drop non-finite, out of range (i.e. 1E30 nulls) and 0,0 points
+    :param points: (n, 2) array of lon, lat
+    :return: The valid rows
+    """
+    lon, lat = points[:, 0], points[:, 1]
+    keep = (
+        np.isfinite(lon)
+        & np.isfinite(lat)
+        & (np.abs(lon) <= 180)
+        & (np.abs(lat) <= 90)
+        & ~((np.abs(lon) < HULL_ZERO_EPSILON) & (np.abs(lat) < HULL_ZERO_EPSILON))
+    )
+    return points[keep]
+
+
+def thin_points(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Keep one (real) point per grid cell of the given size
+    :param points: (n, 2) array of lon, lat
+    :param tolerance: Grid cell size, in degrees
+    :return: The thinned points
+    """
+    cells = np.floor(points / tolerance).astype(np.int64)
+    _, first = np.unique(cells, axis=0, return_index=True)
+    return points[np.sort(first)]
+
+
+def hull_points(rows) -> np.ndarray:
+    """
+    Reduce a stream of lon/lat rows to at most HULL_MAX_POINTS, a fetch batch
+    at a time, so memory and concave_hull time stay bounded no matter how
+    many wells a project has. The grid starts at HULL_GRID_TOLERANCE and
+    doubles whenever too many cells are occupied.
+    :param rows: Iterator of (lon, lat) rows
+    :return: (n, 2) array of lon, lat
+    """
+    tolerance = HULL_GRID_TOLERANCE
+    points = np.empty((0, 2))
+    batch = []
+
+    def merge(points, batch):
+        incoming = valid_lonlat(np.array(batch, dtype=float).reshape(-1, 2))
+        points = thin_points(np.concatenate([points, incoming]), tolerance)
+        return points
+
+    for row in rows:
+        batch.append((row[0], row[1]))
+        if len(batch) >= DB_FETCH_SIZE:
+            points = merge(points, batch)
+            batch = []
+            while len(points) > HULL_MAX_POINTS:
+                tolerance *= 2
+                points = thin_points(points, tolerance)
+
+    if batch:
+        points = merge(points, batch)
+    while len(points) > HULL_MAX_POINTS:
+        tolerance *= 2
+        points = thin_points(points, tolerance)
+
+    return points
+
+
 def hull_outline(repo_base) -> dict:
     """
     https://concave-hull.readthedocs.io/en/latest/
@@ -186,6 +303,8 @@ def hull_outline(repo_base) -> dict:
     :param repo_base: A stub repo dict. We just use the fs_path
     :return: dict with hull (List of points)
     """
+    from concave_hull import concave_hull
+
     logger.send_message(
         directive="note",
         repo_id=repo_base["id"],
@@ -193,14 +312,14 @@ def hull_outline(repo_base) -> dict:
         workflow="recon",
     )
 
-    res = db_exec(repo_base["conn"], NOTNULL_LONLAT)
-    points = [[r["lon"], r["lat"]] for r in res]
+    with db_cursor(repo_base["conn"]) as cursor:
+        points = hull_points(stream_rows(cursor, NOTNULL_LONLAT))
 
     if len(points) < 3:
         print(f"Too few valid Lon/Lat points for polygon: {repo_base["name"]}")
         return {"outline": None}
 
-    hull = concave_hull(points, concavity=HULL_CONCAVITY)
+    hull = np.asarray(concave_hull(points, concavity=HULL_CONCAVITY)).tolist()
     first_point = hull[0]
     hull.append(first_point)
     return {"outline": hull}
@@ -1,16 +1,28 @@
-import glob
 import os
+import queue
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from subprocess import run
+from dotenv import load_dotenv
 from common.util import normalize_path, hostname, hashify, SUITE
 from common.dbisam import make_conn_params
 from common.logger import Logger
-from typing import List
+from typing import Iterator, List, Optional, Tuple
 
 # from common.debugger import debugger
 
-DUPATH = "bin/du64.exe"
+load_dotenv()
+
+# concurrent directory scans while looking for projects (I/O bound)
+RECON_WALK_WORKERS = int(os.environ.get("RECON_WALK_WORKERS") or 16)
+
+# concurrent subdirectory walks while collecting a project's dir stats
+RECON_STAT_WORKERS = int(os.environ.get("RECON_STAT_WORKERS") or 8)
+
+# walk_repos bookkeeping messages
+WALK_SPAWNED = object()
+WALK_DONE = object()
 
 
 logger = Logger(__name__)
@@ -31,122 +43,201 @@ logger = Logger(__name__)
 
 
 def is_petra_project(maybe: str) -> bool:
-    db = os.path.join(maybe, 'DB')
-    parms = os.path.join(maybe, 'PARMS')
-    well_dat = os.path.join(maybe, 'DB', 'WELL.DAT')
-    return (
-        os.path.isdir(db) and os.path.isdir(parms) and os.path.isfile(well_dat)
-    )
+    db = os.path.join(maybe, "DB")
+    parms = os.path.join(maybe, "PARMS")
+    well_dat = os.path.join(maybe, "DB", "WELL.DAT")
+    return os.path.isdir(db) and os.path.isdir(parms) and os.path.isfile(well_dat)
+
+
+def make_repo_stub(path: str) -> dict:
+    return {
+        "id": hashify(normalize_path(path)),
+        "name": os.path.basename(path),
+        "fs_path": normalize_path(path),
+        "conn": make_conn_params(path),
+        # "conn_aux": {"ggx_host": ggx_host},
+        "suite": SUITE,
+    }
+
+
+def scan_for_repo(path: str) -> Tuple[Optional[dict], List[str]]:
+    """
+    Scan one directory. A directory holding both DB and PARMS is a project
+    (if it also has a <dirname>.ini and DB/WELL.DAT) and is never descended
+    into; otherwise its subdirectories are returned for scanning.
+    :param path: A directory path
+    :return: tuple of (repo stub or None, subdirectories to scan)
+    """
+    subdirs = []
+    names = set()
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                names.add(entry.name.lower())
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                except OSError:
+                    continue
+    except OSError as error:
+        logger.warning(f"cannot scan {path}: {error}")
+        return None, []
+
+    if "db" in names and "parms" in names:
+        proj_ini = f"{os.path.basename(path)}.ini".lower()
+        if proj_ini in names and is_petra_project(path):
+            return make_repo_stub(path), []
+        logger.warning(f"DB and PARMS, but not a project?: {path}")
+        return None, []
+
+    return None, subdirs
 
 
 # @debugger
-def glob_repos(recon_root: str) -> List[dict]:
+def walk_repos(
+    recon_root: str, stop: Optional[threading.Event] = None
+) -> Iterator[dict]:
     """
-    Use glob matching to look for candidate geographix projects. This scheme is
-    faster (and simpler) than walking directory trees, but there may be some
-    native or multithreaded scheme that is better for huge filesystems.
+    Walk recon_root with os.scandir on a thread pool and yield Petra project
+    stubs as soon as they are found. Project internals are pruned. Each worker
+    walks its subtree depth-first, handing subdirectories back to the pool
+    only while some worker is idle, so many slow SMB round trips stay in
+    flight without paying pool overhead for every directory.
     Petra projects have an INI file that matches the project dir name.
-    :param recon_root:
-    :return:
+    Closing the iterator early stops the walkers and drops queued walks.
+    :param recon_root: The directory to search
+    :param stop: Set from another thread to end the walk early
+    :return: Iterator of repo stub dicts
     """
     logger.send_message(
         directive="note",
-        data={"note": f"recursive glob search: {recon_root}"},
+        data={"note": f"parallel directory search: {recon_root}"},
         workflow="recon",
     )
-    repo_list = []
-    proj_ini = f"{os.path.basename(recon_root)}.ini"
-    hits = glob.glob(os.path.join(recon_root, proj_ini), recursive=True)
-    for hit in hits:
-        maybe = os.path.dirname(hit)
-        if is_petra_project(maybe):
-            repo_list.append(
-                {
-                    "id": hashify(normalize_path(maybe)),
-                    "name": os.path.basename(maybe),
-                    "fs_path": normalize_path(maybe),
-                    "conn": make_conn_params(maybe),
-                    # "conn_aux": {"ggx_host": ggx_host},
-                    "suite": SUITE,
-                }
-            )
-        else:
-            logger.warning(f"Glob match, but not a project?: {maybe}")
-
-    return repo_list
+    results = queue.Queue()
+    lock = threading.Lock()
+    stop = stop or threading.Event()
+    busy = 0  # walks queued or running
+
+    def submit(path: str):
+        nonlocal busy
+        with lock:
+            busy += 1
+        executor.submit(walk, path)
+
+    def walk(path: str):
+        nonlocal busy
+        try:
+            stack = [path]
+            while stack and not stop.is_set():
+                repo_base, subdirs = scan_for_repo(stack.pop())
+                if repo_base:
+                    results.put(repo_base)
+                for subdir in subdirs:
+                    if busy < RECON_WALK_WORKERS:
+                        results.put(WALK_SPAWNED)
+                        submit(subdir)
+                    else:
+                        stack.append(subdir)
+        finally:
+            with lock:
+                busy -= 1
+            results.put(WALK_DONE)
+
+    with ThreadPoolExecutor(max_workers=RECON_WALK_WORKERS) as executor:
+        try:
+            submit(recon_root)
+            running = 1
+            while running:
+                result = results.get()
+                if result is WALK_DONE:
+                    running -= 1
+                elif result is WALK_SPAWNED:
+                    running += 1
+                else:
+                    yield result
+        finally:
+            # the consumer may have stopped early (closed this generator)
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
 
 
-def dir_stats(repo_base) -> dict:
+def scan_stats(path: str) -> Tuple[int, int, int, float, List[str]]:
     """
-    https://learn.microsoft.com/en-us/sysinternals/downloads/du
-    Run microsoft's du utility to collect directory size. Faster than python.
-    :param repo_base: A stub repo dict. We just use the fs_path
-    :return: dict of parsed stdout byte sizes
+    Tally one directory's entries. DirEntry caches the entry type (and on
+    Windows the whole stat) from the listing, so each file costs at most one
+    stat call.
+    :param path: A directory path
+    :return: tuple of (files, directories, bytes, newest file mtime, subdirs)
     """
-    logger.send_message(
-        directive="note",
-        repo_id=repo_base["id"],
-        data={"note": f"collecting dir stats @ {repo_base["fs_path"]}"},
-        workflow="recon",
-    )
+    files = size = 0
+    newest = 0.0
+    subdirs = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    else:
+                        stat = entry.stat(follow_symlinks=False)
+                        files += 1
+                        size += stat.st_size
+                        newest = max(newest, stat.st_mtime)
+                except OSError:
+                    continue
+    except OSError as error:
+        logger.warning(f"cannot scan {path}: {error}")
+    return files, len(subdirs), size, newest, subdirs
+
+
+def tree_stats(path: str) -> Tuple[int, int, int, float]:
+    """
+    :param path: A directory path
+    :return: tuple of (files, directories, bytes, newest file mtime) for the
+        whole tree below path
+    """
+    totals = [0, 0, 0, 0.0]
+    stack = [path]
+    while stack:
+        files, directories, size, newest, subdirs = scan_stats(stack.pop())
+        totals[0] += files
+        totals[1] += directories
+        totals[2] += size
+        totals[3] = max(totals[3], newest)
+        stack.extend(subdirs)
+    return tuple(totals)
 
-    res = run(
-        [DUPATH, "-q", "-nobanner", repo_base["fs_path"]],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
-    meta = {}
-    lines = res.stdout.splitlines()
-    for line in lines:
-        if line:
-            pair = line.split(":")
-            left = pair[0].strip()
-            right = pair[1].replace("bytes", "").replace(",", "").strip()
-            if left == "Size":
-                meta["bytes"] = int(right)
-            elif left != "Size on disk":
-                meta[left.lower()] = int(right)
-    return meta
-
-
-def repo_mod(repo_base) -> dict:
+
+def dir_stats(repo_base) -> dict:
     """
-    Recursively traverse project folders to determine the most recently modified
-    project file date. We exclude SQLAnywhere, since the act of connecting to it
-    will update the mod dates. No, this is not performant.
-    TODO: optimize this
+    Count files, directories and bytes and find the most recently modified
+    file in a single pass over the project, with each top-level subdirectory
+    walked in parallel (up to RECON_STAT_WORKERS)
     :param repo_base: A stub repo dict. We just use the fs_path
-    :return: dict with repo_mode date
+    :return: dict of files, directories, bytes and repo_mod
     """
     logger.send_message(
         directive="note",
         repo_id=repo_base["id"],
-        data={"note": f"calculating repo mod @ {repo_base["fs_path"]}"},
+        data={"note": f"collecting dir stats @ {repo_base["fs_path"]}"},
         workflow="recon",
     )
 
-    last_mod = datetime(1970, 1, 1)
-
-    def traverse(dir_path: str):
-        nonlocal last_mod
-        for f in os.listdir(dir_path):
-            full_path = os.path.join(dir_path, f)
-            try:
-                stat = os.stat(full_path)
-                if os.path.isdir(full_path):
-                    traverse(full_path)
-                else:
-                    mod_time = datetime.fromtimestamp(stat.st_mtime)
-                    if mod_time > last_mod:
-                        last_mod = mod_time
-                    # gxdb_matcher = r"gxdb\.db$|gxdb_production\.db$|gxdb\.log$"
-                    # if not re.match(gxdb_matcher, f):
-                    #     mod_time = datetime.fromtimestamp(stat.st_mtime)
-                    #     if mod_time > last_mod:
-                    #         last_mod = mod_time
-            except (OSError, ValueError):
-                continue
-
-    traverse(repo_base["fs_path"])
-    return {"repo_mod": last_mod.strftime("%Y-%m-%d %H:%M:%S")}
+    files, directories, size, newest, subdirs = scan_stats(repo_base["fs_path"])
+
+    if subdirs:
+        workers = min(RECON_STAT_WORKERS, len(subdirs))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for f, d, b, m in executor.map(tree_stats, subdirs):
+                files += f
+                directories += d
+                size += b
+                newest = max(newest, m)
+
+    return {
+        "files": files,
+        "directories": directories,
+        "bytes": size,
+        "repo_mod": datetime.fromtimestamp(newest).strftime("%Y-%m-%d %H:%M:%S"),
+    }
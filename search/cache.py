@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+
+from collections import OrderedDict, defaultdict
+from dotenv import load_dotenv
+from typing import Any, Dict, Hashable, Optional
+
+load_dotenv()
+
+# max cached asset searches (0 disables the cache)
+SEARCH_CACHE_SIZE = int(os.environ.get("SEARCH_CACHE_SIZE") or 1024)
+
+# seconds before a cached search expires (covers writes from other processes)
+SEARCH_CACHE_TTL = int(os.environ.get("SEARCH_CACHE_TTL") or 300)
+
+
+class SearchCache:
+    """
+    A thread-safe LRU/TTL cache of per-asset search results. Each asset table
+    has a generation counter; pg_upserter bumps it after committing to that
+    table, which retires every cached entry for the asset at once. Callers
+    read generation() before querying and hand it to put(), so a result read
+    before an invalidation is never stored as current.
+    """
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: OrderedDict = OrderedDict()
+        self.generations: Dict[str, int] = defaultdict(int)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, asset: str, key: Hashable) -> Optional[Any]:
+        """
+        :param asset: The asset/table name
+        :param key: Anything hashable that identifies the search
+        :return: The cached value, or None on a miss
+        """
+        with self.lock:
+            entry = self.entries.get((asset, key))
+            if entry:
+                generation, expires, value = entry
+                if generation == self.generations[asset] and expires > time.monotonic():
+                    self.entries.move_to_end((asset, key))
+                    self.hits += 1
+                    return value
+                del self.entries[(asset, key)]
+            self.misses += 1
+            return None
+
+    def generation(self, asset: str) -> int:
+        """
+        :param asset: The asset/table name
+        :return: The asset's current generation (read it before querying)
+        """
+        with self.lock:
+            return self.generations[asset]
+
+    def put(self, asset: str, key: Hashable, value: Any, generation: int) -> None:
+        """
+        :param asset: The asset/table name
+        :param key: Anything hashable that identifies the search
+        :param value: The result to cache
+        :param generation: generation(asset) from before the query ran; if the
+            asset was invalidated since, the result is stale and not stored
+        :return: None
+        """
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            if generation != self.generations[asset]:
+                return
+            expires = time.monotonic() + self.ttl
+            self.entries[(asset, key)] = (generation, expires, value)
+            self.entries.move_to_end((asset, key))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, asset: str) -> None:
+        """
+        Retire all cached results for an asset table (i.e. after new data)
+        :param asset: The asset/table name
+        :return: None
+        """
+        with self.lock:
+            self.generations[asset] += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+search_cache = SearchCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
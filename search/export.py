@@ -0,0 +1,802 @@
+import csv
+import io
+import json
+import os
+import queue
+import textwrap
+import threading
+import zlib
+
+import psycopg2
+import psycopg2.extras
+
+from datetime import datetime
+from dotenv import load_dotenv
+from common.logger import Logger
+from common.typeish import ExportTaskBody
+from common.util import local_pg_params
+from collections import defaultdict
+from contextlib import closing
+from functools import partial
+from itertools import batched, chain
+from psycopg2 import sql
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+)
+
+load_dotenv()
+logger = Logger(__name__)
+
+# (key1, key2) doc columns; key2 is None for top-level (non-object) values
+Column = Tuple[str, Optional[str]]
+
+BATCH_SIZE = 1000
+
+JSON_INDENT = 4
+
+# rows per parquet row group / arrow record batch
+ROW_GROUP_SIZE = 50000
+
+FILE_EXTENSIONS = {
+    "csv": ".csv",
+    "json": ".json",
+    "ndjson": ".ndjson",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+BINARY_FORMATS = {"parquet", "arrow"}
+
+# formats with a fixed set of flattened columns, see plan_header()
+HEADER_FORMATS = {"csv", "parquet", "arrow"}
+
+# rows inspected for header keys (unset or 0 means the whole result)
+HEADER_SAMPLE_ROWS = int(os.environ.get("EXPORT_HEADER_SAMPLE_ROWS") or 0)
+
+HEADER_KEYS_SQL = sql.SQL(
+    "SELECT key1, key2 FROM ("
+    "SELECT k1.key AS key1, k2.key AS key2, "
+    "MIN(MIN(k1.n)) OVER (PARTITION BY k1.key) AS n1, MIN(k2.n) AS n2 "
+    "FROM ({source}) AS q "
+    "CROSS JOIN LATERAL jsonb_each(q.doc) WITH ORDINALITY AS k1(key, value, n) "
+    "LEFT JOIN LATERAL jsonb_object_keys("
+    "CASE WHEN jsonb_typeof(k1.value) = 'object' THEN k1.value END"
+    ") WITH ORDINALITY AS k2(key, n) ON TRUE "
+    "WHERE k2.key IS NOT NULL OR jsonb_typeof(k1.value) <> 'object' "
+    "GROUP BY k1.key, k2.key"
+    ") AS h "
+    "ORDER BY n1, key1, n2 NULLS FIRST, key2"
+)
+
+# the header plus, per column, the JSON types seen (see column_arrow_type);
+# for arrays of objects (i.e. perfs) also each item field's types
+HEADER_TYPES_SQL = sql.SQL(
+    "SELECT key1, key2, types, non_integer, item_types, item_non_integer, "
+    "field_types, field_non_integer FROM ("
+    "SELECT c.key1, c.key2, "
+    "MIN(MIN(c.n1)) OVER (PARTITION BY c.key1) AS n1, MIN(c.n2) AS n2, "
+    "array_agg(DISTINCT jsonb_typeof(c.value)) AS types, "
+    "COALESCE(bool_or({c_non_integer}), FALSE) AS non_integer, "
+    "array_agg(DISTINCT jsonb_typeof(e.value)) "
+    "FILTER (WHERE e.value IS NOT NULL) AS item_types, "
+    "COALESCE(bool_or({e_non_integer}), FALSE) AS item_non_integer, "
+    "array_agg(DISTINCT ARRAY[f.key, jsonb_typeof(f.value)]) "
+    "FILTER (WHERE f.key IS NOT NULL) AS field_types, "
+    "array_agg(DISTINCT f.key) FILTER (WHERE {f_non_integer}) AS field_non_integer "
+    "FROM ("
+    "SELECT k1.key AS key1, k2.key AS key2, k1.n AS n1, k2.n AS n2, "
+    "COALESCE(k2.value, k1.value) AS value "
+    "FROM ({source}) AS q "
+    "CROSS JOIN LATERAL jsonb_each(q.doc) WITH ORDINALITY AS k1(key, value, n) "
+    "LEFT JOIN LATERAL jsonb_each("
+    "CASE WHEN jsonb_typeof(k1.value) = 'object' THEN k1.value END"
+    ") WITH ORDINALITY AS k2(key, value, n) ON TRUE "
+    "WHERE k2.key IS NOT NULL OR jsonb_typeof(k1.value) <> 'object'"
+    ") AS c "
+    "LEFT JOIN LATERAL jsonb_array_elements("
+    "CASE WHEN jsonb_typeof(c.value) = 'array' THEN c.value END"
+    ") AS e(value) ON TRUE "
+    "LEFT JOIN LATERAL jsonb_each("
+    "CASE WHEN jsonb_typeof(e.value) = 'object' THEN e.value END"
+    ") AS f(key, value) ON TRUE "
+    "GROUP BY c.key1, c.key2"
+    ") AS h "
+    "ORDER BY n1, key1, n2 NULLS FIRST, key2"
+)
+
+# a JSON number that does not fit int64 (fractional or out of range)
+NON_INTEGER_SQL = (
+    "CASE WHEN jsonb_typeof({v}) = 'number' "
+    "THEN {v}::numeric % 1 <> 0 OR abs({v}::numeric) > 9223372036854775807 END"
+)
+
+COMPRESSION_EXTENSIONS = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+# columnar formats compress internally; these skip the output stream compressor
+INTERNAL_CODECS = {
+    "parquet": {"gzip", "zstd"},
+    "arrow": {"zstd"},
+}
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# bytes handed to the compression thread per chunk, and max chunks in flight
+COMPRESS_CHUNK_SIZE = 1024 * 1024
+COMPRESS_QUEUE_DEPTH = 8
+
+
+def is_stream_compressed(task) -> bool:
+    return bool(task.compression) and task.compression not in INTERNAL_CODECS.get(
+        task.file_format, set()
+    )
+
+
+def get_output_file(task):
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    file_extension = FILE_EXTENSIONS.get(task.file_format, ".json")
+    if is_stream_compressed(task):
+        file_extension += COMPRESSION_EXTENSIONS[task.compression]
+    output_file = f"{task.asset}_{timestamp}_{task.user_id}{file_extension}"
+    return output_file
+
+
+def make_compressor(compression: str):
+    """
+    Return a streaming compressor object exposing compress() and flush().
+    zstd requires the optional zstandard package.
+    :param compression: gzip or zstd
+    :return: A compressobj
+    """
+    if compression == "gzip":
+        # wbits=31 writes a gzip (rather than zlib) header and trailer
+        return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as ie:
+            raise ImportError("zstandard is required for zstd compression") from ie
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    raise ValueError(f"Unsupported export compression: {compression}")
+
+
+class ThreadedCompressor(io.RawIOBase):
+    """
+    A write-only binary stream that compresses on a background thread. Writes
+    are queued (bounded by COMPRESS_QUEUE_DEPTH) and the thread compresses and
+    writes them to fileobj. zlib and zstandard release the GIL, so compression
+    overlaps the fetch/serialize loop rather than adding to it. Wrap it in a
+    BufferedWriter so the thread gets large chunks.
+    """
+
+    def __init__(self, fileobj: BinaryIO, compression: str):
+        super().__init__()
+        self.fileobj = fileobj
+        self.compressor = make_compressor(compression)
+        self.chunks = queue.Queue(maxsize=COMPRESS_QUEUE_DEPTH)
+        self.error: Optional[Exception] = None
+        self.thread = threading.Thread(target=self._drain, daemon=True)
+        self.thread.start()
+
+    def writable(self):
+        return True
+
+    def write(self, b) -> int:
+        if self.error:
+            raise self.error
+        self.chunks.put(bytes(b))
+        return len(b)
+
+    def _drain(self):
+        try:
+            while (chunk := self.chunks.get()) is not None:
+                self.fileobj.write(self.compressor.compress(chunk))
+            self.fileobj.write(self.compressor.flush())
+        except Exception as e:
+            self.error = e
+            # keep consuming so the writer never blocks on a full queue
+            while self.chunks.get() is not None:
+                pass
+
+    def close(self):
+        if self.closed:
+            return
+        self.chunks.put(None)
+        self.thread.join()
+        self.fileobj.close()
+        super().close()
+        if self.error:
+            raise self.error
+
+
+def open_output(output_path: str, task: ExportTaskBody):
+    """
+    Open the export file for the task's writer: binary for columnar formats,
+    text otherwise, optionally through a ThreadedCompressor.
+    :param output_path: Full path of the export file
+    :param task: ExportTaskBody
+    :return: A file object
+    """
+    binary = task.file_format in BINARY_FORMATS
+
+    if not is_stream_compressed(task):
+        if binary:
+            return open(output_path, mode="wb")
+        return open(output_path, mode="w", newline="")
+
+    stream = io.BufferedWriter(
+        ThreadedCompressor(open(output_path, mode="wb"), task.compression),
+        buffer_size=COMPRESS_CHUNK_SIZE,
+    )
+    if binary:
+        return stream
+    return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+
+
+def stream_docs(cur, batch_size: int = BATCH_SIZE) -> Iterator[dict]:
+    """
+    Yield the doc column of each row as it is fetched. The cursor should be a
+    named (server-side) cursor so that only batch_size rows are ever held in
+    memory, regardless of the size of the export.
+    :param cur: An executed psycopg2 cursor
+    :param batch_size: Number of rows per fetchmany round trip
+    :return: Iterator of doc dicts (empty dict for null docs)
+    """
+    doc_index = None
+    while True:
+        rows = cur.fetchmany(size=batch_size)
+        if not rows:
+            break
+
+        # Because we may select more than just doc (named cursors only have a
+        # description after the first fetch)
+        if doc_index is None:
+            colnames = [desc[0] for desc in cur.description]
+            doc_index = colnames.index("doc")
+
+        for row in rows:
+            yield row[doc_index] or {}
+
+
+def column_names(header: List[Column]) -> List[str]:
+    return [key1 if key2 is None else f"{key1}__{key2}" for key1, key2 in header]
+
+
+def header_from_doc(doc: dict) -> List[Column]:
+    """
+    The original header scheme: columns from a single doc's keys, with
+    subtables split into (key1, key2) pairs.
+    :param doc: A doc dict
+    :return: List of (key1, key2) columns; key2 is None for top-level values
+    """
+    header = []
+    for key1, value1 in doc.items():
+        if isinstance(value1, dict):
+            header.extend((key1, key2) for key2 in value1.keys())
+        else:
+            header.append((key1, None))
+    return header
+
+
+def plan_header(conn, query: str, sample_rows: int = 0) -> List[Column]:
+    """
+    Collect the full set of doc columns from PostgreSQL so that keys which
+    first appear after the first row still get a column. Only the keys come
+    back over the wire. Columns keep the key order of the docs, grouped by
+    subtable.
+    :param conn: A psycopg2 connection
+    :param query: The export SQL (must select doc)
+    :param sample_rows: Only inspect this many rows (0 means all rows)
+    :return: List of (key1, key2) columns; key2 is None for top-level values
+    """
+    source = sql.SQL(query.strip().rstrip(";"))
+    if sample_rows > 0:
+        source = sql.SQL("SELECT * FROM ({}) AS s LIMIT {}").format(
+            source, sql.Literal(sample_rows)
+        )
+
+    with conn.cursor() as cur:
+        cur.execute(HEADER_KEYS_SQL.format(source=source))
+        return [(key1, key2) for key1, key2 in cur.fetchall()]
+
+
+def make_accessor(key1: str, key2: Optional[str]) -> Callable[[dict], Any]:
+    """
+    Compile a getter for one column so the per-row work is a dict lookup or
+    two, rather than re-parsing the column name for every cell.
+    :param key1: Top-level doc key
+    :param key2: Subtable key (or None for a top-level value)
+    :return: function of doc -> value (None if absent)
+    """
+    if key2 is None:
+
+        def get(doc):
+            value = doc.get(key1)
+            return None if isinstance(value, dict) else value
+
+    else:
+
+        def get(doc):
+            sub = doc.get(key1)
+            return sub.get(key2) if isinstance(sub, dict) else None
+
+    return get
+
+
+def csv_cell(value):
+    return json.dumps(value) if isinstance(value, (list, dict)) else value
+
+
+def write_csv(
+    docs: Iterator[dict],
+    outfile: TextIO,
+    task: ExportTaskBody,
+    header: Optional[List[Column]] = None,
+) -> int:
+    """
+    Flatten docs into CSV rows. Subtables (i.e. doc.well) are split into
+    key1__key2 columns. Column accessors are compiled once from the planned
+    header (or the first doc if there is no plan).
+    :param docs: Iterator of doc dicts
+    :param outfile: A text file opened with newline=""
+    :param task: ExportTaskBody
+    :param header: Planned columns, see plan_header()
+    :return: Number of docs written
+    """
+    first_doc = next(docs, None)
+    if first_doc is None:
+        return 0
+
+    if header is None:
+        header = header_from_doc(first_doc)
+    getters = [make_accessor(key1, key2) for key1, key2 in header]
+
+    csv_writer = csv.writer(outfile)
+    csv_writer.writerow(column_names(header))
+
+    count = 0
+    for doc in chain([first_doc], docs):
+        csv_writer.writerow([csv_cell(get(doc)) for get in getters])
+        count += 1
+
+    return count
+
+
+def make_copy_query(query: str, header: List[Column]) -> sql.Composed:
+    """
+    Push the doc flattening into SQL: one doc->'key1'->>'key2' expression per
+    planned column, named like the CSV header (key1__key2), wrapped in COPY.
+    Values match write_csv except booleans, which PostgreSQL renders as
+    true/false.
+    :param query: The export SQL (must select doc)
+    :param header: Planned columns, see plan_header()
+    :return: A COPY ... TO STDOUT statement
+    """
+    columns = []
+    for (key1, key2), name in zip(header, column_names(header)):
+        if key2 is None:
+            expr = sql.SQL(
+                "CASE WHEN jsonb_typeof(q.doc->{k1}) <> 'object' "
+                "THEN q.doc->>{k1} END"
+            ).format(k1=sql.Literal(key1))
+        else:
+            expr = sql.SQL("q.doc->{k1}->>{k2}").format(
+                k1=sql.Literal(key1), k2=sql.Literal(key2)
+            )
+        columns.append(sql.SQL("{} AS {}").format(expr, sql.Identifier(name)))
+
+    return sql.SQL(
+        "COPY (SELECT {columns} FROM ({source}) AS q) TO STDOUT WITH CSV HEADER"
+    ).format(
+        columns=sql.SQL(", ").join(columns),
+        source=sql.SQL(query.strip().rstrip(";")),
+    )
+
+
+def copy_csv(conn, query: str, header: List[Column], outfile: TextIO) -> int:
+    """
+    CSV fast path: PostgreSQL flattens and formats every row and streams the
+    result straight into outfile, so there is no per-row Python work at all.
+    :param conn: A psycopg2 connection
+    :param query: The export SQL (must select doc)
+    :param header: Planned columns, see plan_header()
+    :param outfile: A text (or binary) file
+    :return: Number of rows written
+    """
+    with conn.cursor() as cur:
+        cur.copy_expert(make_copy_query(query, header).as_string(conn), outfile)
+        return cur.rowcount
+
+
+def write_json(
+    docs: Iterator[dict],
+    outfile: TextIO,
+    task: ExportTaskBody,
+    header: Optional[List[Column]] = None,
+) -> int:
+    """
+    Stream docs out as a single JSON array, one element at a time. The default
+    output matches json.dump(data, indent=4); compact mode drops all
+    indentation and whitespace.
+    :param docs: Iterator of doc dicts
+    :param outfile: A text file
+    :param task: ExportTaskBody
+    :return: Number of docs written
+    """
+    if task.compact:
+        dumps_args = {"separators": (",", ":")}
+        lead, sep, tail = "", ",", ""
+    else:
+        dumps_args = {"indent": JSON_INDENT}
+        lead, sep, tail = "\n", ",\n", "\n"
+
+    count = 0
+    outfile.write("[")
+    for doc in docs:
+        text = json.dumps(doc, **dumps_args)
+        if not task.compact:
+            text = textwrap.indent(text, " " * JSON_INDENT)
+        outfile.write(sep if count else lead)
+        outfile.write(text)
+        count += 1
+    outfile.write((tail if count else "") + "]")
+
+    return count
+
+
+def write_ndjson(
+    docs: Iterator[dict],
+    outfile: TextIO,
+    task: ExportTaskBody,
+    header: Optional[List[Column]] = None,
+) -> int:
+    """
+    Write newline-delimited JSON: one compact doc per line.
+    :param docs: Iterator of doc dicts
+    :param outfile: A text file
+    :param task: ExportTaskBody
+    :return: Number of docs written
+    """
+    count = 0
+    for doc in docs:
+        outfile.write(json.dumps(doc, separators=(",", ":")))
+        outfile.write("\n")
+        count += 1
+
+    return count
+
+
+def column_arrow_type(
+    types,
+    non_integer,
+    item_types,
+    item_non_integer,
+    field_types=None,
+    field_non_integer=None,
+):
+    """
+    Pick the arrow type for a column from the JSON types found across the
+    whole planned result: int64, float64, bool, string, a list of one of
+    those, or a list of structs for arrays of objects (i.e. perfs, fmtest).
+    Struct fields are in name order; a field that is always null is a string.
+    Columns with mixed types (including any mixed struct field) or deeper
+    nesting get None and are written as JSON text, so no value is ever
+    coerced to fit another row's type.
+    :param types: Distinct jsonb_typeof of the column's values
+    :param non_integer: Any number that does not fit int64
+    :param item_types: Distinct jsonb_typeof of array items
+    :param item_non_integer: Any array item number that does not fit int64
+    :param field_types: Distinct [field, jsonb_typeof] of object item fields
+    :param field_non_integer: Object item fields with a number not fitting int64
+    :return: A pyarrow.DataType, or None for JSON text
+    """
+    import pyarrow as pa
+
+    def scalar(found, fractional):
+        found = set(found or ()) - {"null"}
+        if found == {"number"}:
+            return pa.float64() if fractional else pa.int64()
+        if found == {"string"}:
+            return pa.string()
+        if found == {"boolean"}:
+            return pa.bool_()
+        return None
+
+    def struct():
+        found = defaultdict(set)
+        for field, field_type in field_types or ():
+            found[field].add(field_type)
+        fractional = set(field_non_integer or ())
+
+        fields = []
+        for field in sorted(found):
+            if found[field] == {"null"}:
+                fields.append(pa.field(field, pa.string()))
+                continue
+            field_type = scalar(found[field], field in fractional)
+            if field_type is None:
+                return None
+            fields.append(pa.field(field, field_type))
+        return pa.struct(fields) if fields else None
+
+    if set(types or ()) - {"null"} == {"array"}:
+        if set(item_types or ()) - {"null"} == {"object"}:
+            item_type = struct()
+        else:
+            item_type = scalar(item_types, item_non_integer)
+        return pa.list_(item_type) if item_type is not None else None
+    return scalar(types, non_integer)
+
+
+def plan_columns(conn, query: str, sample_rows: int = 0):
+    """
+    Like plan_header(), but also type each column for Parquet/Arrow from every
+    (or the first sample_rows) doc, rather than from the first row group.
+    :param conn: A psycopg2 connection
+    :param query: The export SQL (must select doc)
+    :param sample_rows: Only inspect this many rows (0 means all rows)
+    :return: tuple of (header, dict of column name -> pyarrow type or None)
+    """
+    source = sql.SQL(query.strip().rstrip(";"))
+    if sample_rows > 0:
+        source = sql.SQL("SELECT * FROM ({}) AS s LIMIT {}").format(
+            source, sql.Literal(sample_rows)
+        )
+
+    statement = HEADER_TYPES_SQL.format(
+        source=source,
+        c_non_integer=sql.SQL(NON_INTEGER_SQL.format(v="c.value")),
+        e_non_integer=sql.SQL(NON_INTEGER_SQL.format(v="e.value")),
+        f_non_integer=sql.SQL(NON_INTEGER_SQL.format(v="f.value")),
+    )
+    with conn.cursor() as cur:
+        cur.execute(statement)
+        rows = cur.fetchall()
+
+    header = [(key1, key2) for key1, key2, *_ in rows]
+    types = {
+        name: column_arrow_type(*row[2:])
+        for name, row in zip(column_names(header), rows)
+    }
+    return header, types
+
+
+def conforms(value, data_type) -> bool:
+    """
+    :param value: A flattened doc value
+    :param data_type: A planned pyarrow type (not JSON text)
+    :return: True if value can be written as data_type without loss
+    """
+    import pyarrow as pa
+
+    if value is None:
+        return True
+    if pa.types.is_int64(data_type):
+        if isinstance(value, float):
+            return value.is_integer() and abs(value) < 2**63
+        return type(value) is int and -(2**63) <= value < 2**63
+    if pa.types.is_float64(data_type):
+        return type(value) in (int, float)
+    if pa.types.is_boolean(data_type):
+        return type(value) is bool
+    if pa.types.is_string(data_type):
+        return isinstance(value, str)
+    if pa.types.is_list(data_type):
+        return isinstance(value, list) and all(
+            conforms(v, data_type.value_type) for v in value
+        )
+    if pa.types.is_struct(data_type):
+        fields = {field.name: field.type for field in data_type}
+        return isinstance(value, dict) and all(
+            key in fields and conforms(v, fields[key]) for key, v in value.items()
+        )
+    return False
+
+
+def to_arrow(value, data_type):
+    """
+    :param value: A flattened doc value that conforms to data_type
+    :param data_type: A planned pyarrow type (not JSON text)
+    :return: The value with whole numbers in float columns as floats (i.e. 1E30
+        arrives as a python int too large for int64)
+    """
+    import pyarrow as pa
+
+    if value is None:
+        return None
+    if pa.types.is_float64(data_type):
+        return float(value) if type(value) is int else value
+    if pa.types.is_list(data_type):
+        return [to_arrow(v, data_type.value_type) for v in value]
+    if pa.types.is_struct(data_type):
+        return {
+            field.name: to_arrow(value.get(field.name), field.type)
+            for field in data_type
+        }
+    return value
+
+
+def write_columnar(
+    docs: Iterator[dict],
+    outfile: BinaryIO,
+    task: ExportTaskBody,
+    header: Optional[List[Column]] = None,
+    types: Optional[Dict[str, Any]] = None,
+) -> int:
+    """
+    Write flattened docs as Parquet or Arrow IPC (file) in row groups of
+    ROW_GROUP_SIZE as the cursor streams. Columns and their types come from
+    plan_columns(). Columns typed None are written as JSON text. If the plan
+    was sampled (EXPORT_HEADER_SAMPLE_ROWS), each value is checked against its
+    column type and a mismatch fails the export rather than being coerced.
+    Requires the optional pyarrow package.
+    :param docs: Iterator of doc dicts
+    :param outfile: A binary file
+    :param task: ExportTaskBody
+    :param header: Planned columns, see plan_columns()
+    :param types: Planned column name -> pyarrow type (or None for JSON text)
+    :return: Number of docs written
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as ie:
+        raise ImportError(f"pyarrow is required for {task.file_format} export") from ie
+
+    if header is None or types is None:
+        raise ValueError(f"{task.file_format} export needs planned columns")
+
+    def to_json_text(value):
+        return value if value is None or isinstance(value, str) else json.dumps(value)
+
+    codec = None
+    if task.compression in INTERNAL_CODECS[task.file_format]:
+        codec = task.compression
+
+    names = column_names(header)
+    getters = [make_accessor(key1, key2) for key1, key2 in header]
+    schema = pa.schema([pa.field(name, types[name] or pa.string()) for name in names])
+
+    json_columns = [name for name in names if types[name] is None]
+
+    def has_float(data_type):
+        if pa.types.is_list(data_type):
+            return has_float(data_type.value_type)
+        if pa.types.is_struct(data_type):
+            return any(has_float(field.type) for field in data_type)
+        return pa.types.is_float64(data_type)
+
+    # columns that may hold whole numbers for floats (see to_arrow)
+    float_columns = [
+        (name, types[name])
+        for name in names
+        if types[name] is not None and has_float(types[name])
+    ]
+    checked_columns = (
+        [(name, types[name]) for name in names if types[name] is not None]
+        if HEADER_SAMPLE_ROWS > 0
+        else []
+    )
+
+    def flatten(doc):
+        row = {name: get(doc) for name, get in zip(names, getters)}
+        for name, data_type in checked_columns:
+            if not conforms(row[name], data_type):
+                raise ValueError(
+                    f"{name} value {row[name]!r} does not fit {data_type} "
+                    f"(typed from the first {HEADER_SAMPLE_ROWS} rows; "
+                    f"unset EXPORT_HEADER_SAMPLE_ROWS to type every row)"
+                )
+        for name in json_columns:
+            row[name] = to_json_text(row[name])
+        for name, data_type in float_columns:
+            row[name] = to_arrow(row[name], data_type)
+        return row
+
+    if task.file_format == "parquet":
+        writer = pq.ParquetWriter(outfile, schema, compression=codec or "snappy")
+    else:
+        options = pa.ipc.IpcWriteOptions(compression=codec)
+        writer = pa.ipc.new_file(outfile, schema, options=options)
+
+    count = 0
+    try:
+        for rows in batched(map(flatten, docs), ROW_GROUP_SIZE):
+            writer.write_table(pa.Table.from_pylist(list(rows), schema=schema))
+            count += len(rows)
+    finally:
+        writer.close()
+
+    return count
+
+
+EXPORT_WRITERS = {
+    "csv": write_csv,
+    "json": write_json,
+    "ndjson": write_ndjson,
+    "parquet": write_columnar,
+    "arrow": write_columnar,
+}
+
+
+def query_to_file(task: ExportTaskBody):
+    """
+    Execute a SQL query and stream the results to a CSV, JSON, NDJSON, Parquet
+    or Arrow file, optionally gzip/zstd compressed. A partially written file is
+    removed if the export fails.
+
+    Args:
+        task: ExportTaskBody
+
+    Returns:
+        None
+    """
+    writer = EXPORT_WRITERS.get(task.file_format)
+    if not writer:
+        logger.error(f"Unsupported export file_format: {task.file_format}")
+        return
+
+    if task.compression and task.compression not in COMPRESSION_EXTENSIONS:
+        logger.error(f"Unsupported export compression: {task.compression}")
+        return
+
+    output_file = get_output_file(task)
+    output_path = os.path.join(os.environ.get("EXPORT_DIR"), output_file)
+
+    try:
+        params = local_pg_params()
+        with closing(psycopg2.connect(**params)) as conn:
+            header = None
+            if task.file_format in BINARY_FORMATS:
+                header, types = plan_columns(conn, task.sql, HEADER_SAMPLE_ROWS)
+                writer = partial(write_columnar, types=types)
+            elif task.file_format in HEADER_FORMATS:
+                header = plan_header(conn, task.sql, HEADER_SAMPLE_ROWS)
+            if task.file_format in HEADER_FORMATS and not header:
+                print("No data returned from query.")
+                return
+
+            if task.file_format == "csv" and task.use_copy:
+                with open_output(output_path, task) as outfile:
+                    count = copy_csv(conn, task.sql, header, outfile)
+            else:
+                with closing(
+                    conn.cursor(
+                        name="purr_export", cursor_factory=psycopg2.extras.DictCursor
+                    )
+                ) as cur:
+                    cur.itersize = BATCH_SIZE
+                    cur.execute(task.sql)
+
+                    docs = stream_docs(cur)
+                    first_doc = next(docs, None)
+                    if first_doc is None:
+                        print("No data returned from query.")
+                        return
+
+                    with open_output(output_path, task) as outfile:
+                        count = writer(chain([first_doc], docs), outfile, task, header)
+
+        print(f"Data successfully written to {output_path} ({count} docs)")
+
+    except Exception as e:
+        import traceback
+
+        print(f"An error occurred: {e}")
+        traceback.print_exc()
+
+        if os.path.exists(output_path):
+            os.remove(output_path)
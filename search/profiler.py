@@ -0,0 +1,168 @@
+import heapq
+import itertools
+import json
+import os
+import psycopg2
+import threading
+import time
+
+from dotenv import load_dotenv
+from psycopg2 import sql
+from common.logger import Logger
+from typing import Any, Dict, List, Optional
+
+load_dotenv()
+logger = Logger(__name__)
+
+# profile every search (a SearchTaskBody can also opt in with profile=True)
+SEARCH_PROFILE = os.environ.get("SEARCH_PROFILE", "false").lower() == "true"
+
+# queries slower than this are re-run under EXPLAIN ANALYZE
+SEARCH_PROFILE_THRESHOLD_MS = int(os.environ.get("SEARCH_PROFILE_THRESHOLD_MS") or 1000)
+
+# slowest queries kept for the report
+SEARCH_PROFILE_TOP_N = int(os.environ.get("SEARCH_PROFILE_TOP_N") or 20)
+
+# if set, the report is rewritten here after each profiled search
+SEARCH_PROFILE_FILE = os.environ.get("SEARCH_PROFILE_FILE")
+
+EXPLAIN_SQL = sql.SQL("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {}")
+
+
+def walk_plan(node: Dict[str, Any]):
+    """
+    :param node: A node from EXPLAIN (FORMAT JSON) output
+    :return: Iterator over the node and all of its descendants
+    """
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk_plan(child)
+
+
+def summarize_plan(explain: List[Dict[str, Any]]) -> dict:
+    """
+    Reduce EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) output to the numbers that
+    explain a slow search: sequential scans (a missing GIN or trigram index),
+    rows examined vs returned (poorly selective terms) and buffer traffic.
+    :param explain: Parsed EXPLAIN output
+    :return: A plan summary dict
+    """
+    root = explain[0]
+    plan = root["Plan"]
+    nodes = list(walk_plan(plan))
+    # a bitmap heap scan re-counts its bitmap index scan's rows
+    scans = [
+        n
+        for n in nodes
+        if n["Node Type"].endswith("Scan") and n["Node Type"] != "Bitmap Index Scan"
+    ]
+
+    return {
+        "planning_ms": root.get("Planning Time"),
+        "execution_ms": root.get("Execution Time"),
+        "seq_scans": sorted(
+            {n.get("Relation Name", "?") for n in nodes if n["Node Type"] == "Seq Scan"}
+        ),
+        "index_scans": sorted({n["Index Name"] for n in nodes if n.get("Index Name")}),
+        "rows_examined": sum(
+            (n.get("Actual Rows", 0) + n.get("Rows Removed by Filter", 0))
+            * n.get("Actual Loops", 1)
+            for n in scans
+        ),
+        "rows_returned": plan.get("Actual Rows"),
+        "shared_hit_blocks": plan.get("Shared Hit Blocks"),
+        "shared_read_blocks": plan.get("Shared Read Blocks"),
+        "workers_launched": sum(n.get("Workers Launched", 0) for n in nodes),
+    }
+
+
+class SlowQueryLog:
+    """
+    A rolling top-N (by elapsed time) of profiled slow search queries
+    """
+
+    def __init__(self, top_n: int):
+        self.top_n = top_n
+        self.entries: List[tuple] = []
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def record(self, entry: dict) -> None:
+        with self.lock:
+            item = (entry["elapsed_ms"], next(self.counter), entry)
+            if len(self.entries) < self.top_n:
+                heapq.heappush(self.entries, item)
+            else:
+                heapq.heappushpop(self.entries, item)
+
+    def report(self) -> List[dict]:
+        """
+        :return: Profiled queries, slowest first
+        """
+        with self.lock:
+            return [entry for _, _, entry in sorted(self.entries, reverse=True)]
+
+    def dump(self, path: str) -> None:
+        """
+        Write the report as JSON
+        :param path: Output file path
+        :return: None
+        """
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=4, default=str)
+
+
+slow_query_log = SlowQueryLog(SEARCH_PROFILE_TOP_N)
+
+
+def profile_query(
+    cur,
+    label: str,
+    statement: sql.Composable,
+    params: Optional[Any],
+    elapsed: float,
+    query: str,
+) -> Optional[dict]:
+    """
+    If a search statement ran slower than SEARCH_PROFILE_THRESHOLD_MS, run it
+    again under EXPLAIN ANALYZE, log a plan summary and add it to the slow
+    query log. Profiling errors are logged, never raised. The re-run follows
+    the original, so its buffer reads understate a cold cache; elapsed_ms is
+    from the original run.
+    :param cur: A psycopg2 cursor to re-run the statement on
+    :param label: What ran (i.e. the asset name)
+    :param statement: The statement as executed (EXECUTE ... for prepared)
+    :param params: Its parameters
+    :param elapsed: Seconds the statement took
+    :param query: The readable query text for the report
+    :return: The slow query entry, or None if not slow
+    """
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms < SEARCH_PROFILE_THRESHOLD_MS:
+        return None
+
+    try:
+        cur.execute(EXPLAIN_SQL.format(statement), params)
+        summary = summarize_plan(cur.fetchone()[0])
+    except psycopg2.Error as error:
+        logger.warning(f"could not profile slow search on {label}: {error}")
+        return None
+
+    entry = {
+        "label": label,
+        "elapsed_ms": round(elapsed_ms, 1),
+        "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "query": query,
+        "plan": summary,
+        "plan_note": "re-run after the search; buffers reflect a warm cache",
+    }
+    slow_query_log.record(entry)
+
+    logger.warning(
+        f"slow search on {label}: {entry["elapsed_ms"]}ms, "
+        f"seq scans: {summary["seq_scans"] or "none"}, "
+        f"rows examined: {summary["rows_examined"]}, "
+        f"buffers hit/read: {summary["shared_hit_blocks"]}/"
+        f"{summary["shared_read_blocks"]}"
+    )
+    return entry
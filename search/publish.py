@@ -0,0 +1,91 @@
+import json
+import os
+
+from dotenv import load_dotenv
+from typing import Any, Dict, Iterator, List
+
+load_dotenv()
+
+# a supabase upsert is sent once a chunk reaches either limit
+SEARCH_PUBLISH_MAX_BYTES = int(os.environ.get("SEARCH_PUBLISH_MAX_BYTES") or 262144)
+SEARCH_PUBLISH_MAX_ROWS = int(os.environ.get("SEARCH_PUBLISH_MAX_ROWS") or 50)
+
+# doc summary: items kept per list and characters kept per string
+SEARCH_DOC_MAX_LIST = int(os.environ.get("SEARCH_DOC_MAX_LIST") or 10)
+SEARCH_DOC_MAX_STR = int(os.environ.get("SEARCH_DOC_MAX_STR") or 1000)
+
+# comma-separated doc subtables to keep (i.e. "well,perfs"); blank keeps all
+SEARCH_DOC_KEYS = [
+    k.strip() for k in (os.environ.get("SEARCH_DOC_KEYS") or "").split(",") if k.strip()
+]
+
+
+def summarize_doc(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Project a doc down to a search hit summary: keep only SEARCH_DOC_KEYS (if
+    set), the first SEARCH_DOC_MAX_LIST items of each list and the first
+    SEARCH_DOC_MAX_STR characters of each string. The full doc stays in local
+    PG for exports. Truncated top-level keys are listed in doc["_truncated"].
+    :param doc: A doc dict
+    :return: The summarized doc
+    """
+    truncated = set()
+
+    def clip(value, top_key):
+        if isinstance(value, str) and len(value) > SEARCH_DOC_MAX_STR:
+            truncated.add(top_key)
+            return value[:SEARCH_DOC_MAX_STR]
+        if isinstance(value, list):
+            if len(value) > SEARCH_DOC_MAX_LIST:
+                truncated.add(top_key)
+            return [clip(v, top_key) for v in value[:SEARCH_DOC_MAX_LIST]]
+        if isinstance(value, dict):
+            return {k: clip(v, top_key) for k, v in value.items()}
+        return value
+
+    summary = {
+        key: clip(value, key)
+        for key, value in (doc or {}).items()
+        if not SEARCH_DOC_KEYS or key in SEARCH_DOC_KEYS
+    }
+    if truncated:
+        summary["_truncated"] = sorted(truncated)
+    return summary
+
+
+def chunk_hits(hits: List[dict]) -> Iterator[List[dict]]:
+    """
+    Group hit rows into upsert chunks bounded by serialized size and row count,
+    so one large doc cannot push a whole page over realtime payload limits.
+    :param hits: search_result rows
+    :return: Iterator of row lists
+    """
+    chunk = []
+    chunk_bytes = 0
+    for hit in hits:
+        size = len(json.dumps(hit, default=str))
+        if chunk and (
+            chunk_bytes + size > SEARCH_PUBLISH_MAX_BYTES
+            or len(chunk) >= SEARCH_PUBLISH_MAX_ROWS
+        ):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(hit)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+
+def publish_hits(supabase, hits: List[dict]) -> int:
+    """
+    Upsert search hits to the supabase search_result table in chunks
+    :param supabase: A SupabaseClient
+    :param hits: search_result rows
+    :return: Number of upserts sent
+    """
+    sent = 0
+    for chunk in chunk_hits(hits):
+        supabase.table("search_result").upsert(chunk).execute()
+        sent += 1
+    return sent
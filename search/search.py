@@ -1,296 +1,967 @@
-import csv
+import base64
+import itertools
 import json
 import os
-
 import psycopg2
-import psycopg2.extras
 import re
+import threading
+import time
 
-from datetime import datetime
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from dotenv import load_dotenv
+from functools import lru_cache
 from psycopg2 import sql
+from psycopg2.pool import ThreadedConnectionPool
+from asset.schema import search_columns
 from common.logger import Logger
-from common.typeish import SearchTaskBody, ExportTaskBody
+from common.typeish import SearchTaskBody
 from common.util import local_pg_params
-from contextlib import closing
-from typing import List, Dict
+from search.cache import search_cache
+from search.profiler import (
+    profile_query,
+    slow_query_log,
+    SEARCH_PROFILE,
+    SEARCH_PROFILE_FILE,
+    SEARCH_PROFILE_THRESHOLD_MS,
+)
+from search.publish import publish_hits, summarize_doc
+from typing import Any, List, Dict, Optional, Tuple
 
 load_dotenv()
 logger = Logger(__name__)
 
+# hits returned (and published) per asset
+SEARCH_LIMIT = 100
+
+# "capped" count_mode stops counting here
+SEARCH_COUNT_CAP = int(os.environ.get("SEARCH_COUNT_CAP") or 10000)
+
+# "estimate" count_mode trusts the planner above this many estimated rows
+SEARCH_ESTIMATE_THRESHOLD = int(os.environ.get("SEARCH_ESTIMATE_THRESHOLD") or 100000)
+
+COUNT_MODES = ("window", "capped", "estimate")
+
+# concurrent asset queries per search
+SEARCH_ASSET_WORKERS = int(os.environ.get("SEARCH_ASSET_WORKERS") or 4)
+
+# one connection per asset query for every concurrent search (plus one spare)
+SEARCH_POOL_MAX = int(os.environ.get("SEARCH_MAX_WORKERS") or 1) * (
+    SEARCH_ASSET_WORKERS + 1
+)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# slow searches are re-run under EXPLAIN ANALYZE here, one at a time
+_profile_executor = ThreadPoolExecutor(max_workers=1)
+
+# ts_rank or ts_rank_cd (cover density, favours terms that appear together)
+SEARCH_RANK_FUNCTION = (
+    "ts_rank" if os.environ.get("SEARCH_RANK_FUNCTION") == "ts_rank" else "ts_rank_cd"
+)
+
+# Pages are ordered by (rank, id) descending; {seek} resumes after a page
+# token's (rank, id) so deep pages cost the same as the first.
+
+# a page of hits plus the total match count, from a single execution
+WINDOW_PAGE_SQL = sql.SQL(
+    "SELECT * FROM ("
+    "SELECT q.*, count(*) OVER () AS total_hits FROM ({ranked}) AS q"
+    ") AS p {seek} ORDER BY p.rank DESC, p.id DESC LIMIT {limit}"
+)
+
+# the count only scans the first {cap} matches
+CAPPED_PAGE_SQL = sql.SQL(
+    "WITH c AS (SELECT 1 FROM ({query}) AS b LIMIT {cap}) "
+    "SELECT p.*, (SELECT count(*) FROM c) AS total_hits FROM ({ranked}) AS p "
+    "{seek} ORDER BY p.rank DESC, p.id DESC LIMIT {limit}"
+)
+
+PAGE_SQL = sql.SQL(
+    "SELECT p.*, NULL AS total_hits FROM ({ranked}) AS p "
+    "{seek} ORDER BY p.rank DESC, p.id DESC LIMIT {limit}"
+)
+
+SEEK_SQL = sql.SQL("WHERE (p.rank, p.id) < ({rank}::real, {id})")
+
+# a doc's string and number values (no keys) as JSON text, for ILIKE terms
+DOC_VALUES_SQL = sql.SQL(
+    "jsonb_path_query_array(a.doc, "
+    '\'strict $.** ? (@.type() == "string" || @.type() == "number")\')::text'
+)
+
+PAGE_TEMPLATES = {
+    "window": WINDOW_PAGE_SQL,
+    "capped": CAPPED_PAGE_SQL,
+    "page": PAGE_SQL,
+}
+
+# digits a term needs to be searched as a UWI/API number (not a depth, etc.)
+SEARCH_UWI_MIN_DIGITS = int(os.environ.get("SEARCH_UWI_MIN_DIGITS") or 6)
+
+# distinct search strings whose parsed terms are memoized
+SEARCH_TERM_CACHE_SIZE = int(os.environ.get("SEARCH_TERM_CACHE_SIZE") or 256)
+
+
+class SearchConnection(psycopg2.extensions.connection):
+    """
+    A pooled search connection that remembers which page statements it has
+    prepared (prepared statements live as long as the server session)
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared: Dict[tuple, str] = {}
+
+
+class SearchMetrics:
+    """
+    Running totals of time spent preparing (parse/analyze, once per query
+    shape and connection) vs executing page statements
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.lock = threading.Lock()
+
+    def record(self, kind: str, seconds: float) -> None:
+        with self.lock:
+            self.counts[kind] += 1
+            self.seconds[kind] += seconds
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                kind: {
+                    "count": count,
+                    "total_ms": round(self.seconds[kind] * 1000, 1),
+                    "avg_ms": round(self.seconds[kind] * 1000 / count, 2),
+                }
+                for kind, count in self.counts.items()
+            }
+
+
+search_metrics = SearchMetrics()
+
+
+def parse_tag(tag: str) -> Optional[str]:
+    """
+    :param tag: The user's tag filter
+    :return: The tag, or None if blank (wildcard chars are treated literally)
+    """
+    is_valid_tag = tag and isinstance(tag, str) and re.search(r"\S", tag)
+    return tag if is_valid_tag else None
+
+
+def split_terms(terms: str) -> List[str]:
+    """
+    :param terms: The user's search terms
+    :return: Individual terms, or [] if there are no usable terms
+    """
+    # screen out terms comprised of only wildcards/spaces
+    is_valid_terms = (
+        terms and isinstance(terms, str) and not re.match(r"^[*?\s]+$", terms)
+    )
+    if not is_valid_terms:
+        return []
+    return [term for term in re.split(r"\s+", terms) if term.strip()]
+
+
+def is_leading_wildcard(term: str) -> bool:
+    return term[0] in "*?" and bool(re.search(r"[^*?]", term))
+
+
+def is_identifier(term: str) -> bool:
+    """
+    :param term: A search term
+    :return: True if the term looks like a (full or partial) UWI/API number,
+        i.e. 42-501-20130, 4250120130*, *20130 or 100/06-12-045-23W4/00 (but
+        not a decimal like 10250.5 or a date like 2019-05-01)
+    """
+    bare = term.strip("*?")
+    if not re.match(r"^[0-9][0-9A-Za-z/\-*?]*$", bare):
+        return False
+    if re.match(
+        r"^[0-9]{4}-[0-9]{1,2}-[0-9]{1,2}$|^[0-9]{1,2}/[0-9]{1,2}/[0-9]{2,4}$", bare
+    ):
+        return False
+    return len(re.findall(r"[0-9]", bare)) >= SEARCH_UWI_MIN_DIGITS
+
+
+def like_pattern(term: str) -> str:
+    """
+    :param term: A search term, with * and ? wildcards
+    :return: An ILIKE pattern matching the term anywhere in a value
+    """
+    escaped = re.sub(r"([%_\\])", r"\\\1", term.strip("*"))
+    return f"%{escaped.replace("*", "%").replace("?", "_")}%"
+
+
+@lru_cache(maxsize=SEARCH_TERM_CACHE_SIZE)
+def parse_terms(terms: str) -> Optional[str]:
+    """
+    Convert the user's search terms into a to_tsquery string: terms are ANDed
+    and trailing wildcards become prefix matches. Leading-wildcard terms are
+    left to parse_like_terms and identifiers to parse_uwi_terms.
+    :param terms: The user's search terms
+    :return: A tsquery string, or None if there are no usable terms
+    """
+    parsed = [
+        (
+            re.sub(r"\*", ":*", re.sub(r"\?", "_", term))
+            if re.search(r"[*?]", term)
+            else term
+        )
+        for term in split_terms(terms)
+        if not is_leading_wildcard(term) and not is_identifier(term)
+    ]
+    return " & ".join(parsed) if parsed else None
+
+
+@lru_cache(maxsize=SEARCH_TERM_CACHE_SIZE)
+def parse_like_terms(terms: str) -> Tuple[str, ...]:
+    """
+    A tsquery cannot match a leading wildcard (*1234), so those terms become
+    ILIKE patterns on the doc's string and number values instead, prefiltered
+    by the trigram index on the doc text (see asset/schema.py).
+    :param terms: The user's search terms
+    :return: Sorted ILIKE patterns (one per leading-wildcard term)
+    """
+    patterns = set()
+    for term in split_terms(terms):
+        if is_leading_wildcard(term) and not is_identifier(term):
+            patterns.add(like_pattern(term))
+    return tuple(sorted(patterns))
+
+
+@lru_cache(maxsize=SEARCH_TERM_CACHE_SIZE)
+def parse_uwi_terms(terms: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    Identifier terms become LIKE patterns on the normalized uwi_norm column
+    (see asset/schema.py) instead of stemmed tsquery tokens. A term without a
+    leading wildcard is a prefix match, so partial API numbers (state, county)
+    use the btree index; a leading wildcard uses the trigram index. Each term
+    also gets an ILIKE pattern on the doc values, so a number that is not a
+    UWI (or an asset without one) still matches.
+    :param terms: The user's search terms
+    :return: Sorted (uwi_norm LIKE, doc value ILIKE) pairs, one per identifier
+    """
+    patterns = set()
+    for term in split_terms(terms):
+        if is_identifier(term):
+            norm = re.sub(r"[^0-9A-Z*?]", "", term.upper())
+            pattern = norm.replace("*", "%").replace("?", "_")
+            patterns.add(
+                (
+                    pattern if pattern.endswith("%") else f"{pattern}%",
+                    like_pattern(term),
+                )
+            )
+    return tuple(sorted(patterns))
+
+
+def normalize_tsquery(tsquery: Optional[str]) -> Optional[str]:
+    """
+    A canonical form of an AND-only tsquery for cache keys (case and term
+    order do not change the matches)
+    :param tsquery: Output of parse_terms
+    :return: The normalized tsquery
+    """
+    if tsquery is None:
+        return None
+    return " & ".join(sorted({t.lower() for t in tsquery.split(" & ")}))
+
+
+def encode_page_token(rank: float, row_id: str) -> str:
+    """
+    An opaque keyset (seek) pagination token: the (rank, id) of the last hit
+    on a page
+    """
+    payload = json.dumps({"rank": rank, "id": row_id}).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_page_token(token: Optional[str]) -> Optional[Tuple[float, str]]:
+    """
+    :param token: From encode_page_token (or None for the first page)
+    :return: tuple of (rank, id), or None for the first page
+    """
+    if not token:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token))
+        return float(payload["rank"]), str(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        logger.warning(f"ignoring invalid search page token: {token}")
+        return None
+
+
+def compose_asset_query(
+    asset: str,
+    tsquery: Optional[sql.Composable],
+    tag: Optional[sql.Composable],
+    like_terms: List[sql.Composable],
+    uwi_terms: List[Tuple[sql.Composable, sql.Composable]],
+) -> Tuple[sql.Composed, sql.Composed]:
+    """
+    Compose an asset's FTS query. The search values are Composables: Literals
+    for the plain (exportable) query, or $n placeholders for a prepared
+    statement.
+    :param asset: The asset/table name
+    :param tsquery: The to_tsquery string, or None
+    :param tag: The tag filter, or None
+    :param like_terms: ILIKE patterns
+    :param uwi_terms: (uwi_norm LIKE, doc value ILIKE) pattern pairs
+    :return: tuple of (query, ranked query with rank and id columns)
+    """
+    columns = sql.SQL(
+        "repo_id, repo_name, well_id, suite, tag, doc, {field} as asset"
+    ).format(field=sql.Literal(asset))
+
+    where = sql.SQL("FROM {table} a WHERE 1=1 AND").format(
+        table=sql.Identifier(asset),
+    )
+
+    # where += sql.SQL(" a.suite IN ({})").format(
+    #     sql.SQL(",").join(map(sql.Literal, body.suites))
+    # )
+    where += sql.SQL(" a.suite in ('petra')")
+
+    if tag:
+        where += sql.SQL(" AND a.tag = {}").format(tag)
+
+    if tsquery:
+        where += sql.SQL(" AND a.ts @@ to_tsquery('english', {})").format(tsquery)
+        rank = sql.SQL("{}(a.ts, to_tsquery('english', {}))").format(
+            sql.Identifier(SEARCH_RANK_FUNCTION), tsquery
+        )
+    else:
+        rank = sql.SQL("0::real")
+
+    # doc::text (trigram indexed) narrows the candidates; the pattern must
+    # then match a value, not just a key (i.e. *well* would match every doc)
+    for pattern in like_terms:
+        where += sql.SQL(" AND a.doc::text ILIKE {p} AND {values} ILIKE {p}").format(
+            p=pattern, values=DOC_VALUES_SQL
+        )
+
+    for uwi, pattern in uwi_terms:
+        where += sql.SQL(
+            " AND (a.uwi_norm LIKE {uwi}"
+            " OR (a.doc::text ILIKE {p} AND {values} ILIKE {p}))"
+        ).format(uwi=uwi, p=pattern, values=DOC_VALUES_SQL)
+
+    query = sql.SQL("SELECT {} {}").format(columns, where)
+    ranked = sql.SQL("SELECT {}, {} AS rank, a.id AS id {}").format(
+        columns, rank, where
+    )
+    return query, ranked
+
 
 def make_asset_fts_queries(body: SearchTaskBody, conn: psycopg2.extensions.connection):
-    fts_queries: List[Dict[str, str]] = []
+    """
+    Describe the FTS query for each asset: the plain query (sql, which is what
+    the user may later export), plus the shape and params used to run it as a
+    prepared statement (see fetch_page_and_total).
+    :param body: SearchTaskBody
+    :param conn: A psycopg2 connection (for quoting)
+    :return: List of dicts with asset, sql, shape, params, seek and cache_key
+    """
+    fts_queries: List[Dict[str, Any]] = []
+
+    tag = parse_tag(body.tag)
+    tsquery = parse_terms(body.terms)
+    count_mode = body.count_mode if body.count_mode in COUNT_MODES else "window"
 
     for asset in body.assets:
-        query = sql.SQL(
-            "SELECT "
-            "repo_id, repo_name, well_id, suite, tag, doc, {field} as asset "
-            "FROM {table} a "
-            "WHERE "
-            "1=1 AND"
-        ).format(
-            field=sql.Literal(asset),
-            table=sql.Identifier(asset),
+        like_terms = parse_like_terms(body.terms)
+        uwi_terms = parse_uwi_terms(body.terms)
+
+        # a legacy table without uwi_norm (see asset/schema.py) can still
+        # match identifiers by value
+        with conn.cursor() as cur:
+            has_uwi = "uwi_norm" in search_columns(cur, asset)
+        if uwi_terms and not has_uwi:
+            like_terms = tuple(sorted({*like_terms, *(p for _, p in uwi_terms)}))
+            uwi_terms = ()
+
+        params = [v for v in (tsquery, tag) if v] + list(like_terms)
+        params += [pattern for pair in uwi_terms for pattern in pair]
+
+        query, _ = compose_asset_query(
+            asset,
+            sql.Literal(tsquery) if tsquery else None,
+            sql.Literal(tag) if tag else None,
+            [sql.Literal(pattern) for pattern in like_terms],
+            [(sql.Literal(uwi), sql.Literal(like)) for uwi, like in uwi_terms],
         )
 
-        # query += sql.SQL(" a.suite IN ({})").format(
-        #     sql.SQL(",").join(map(sql.Literal, body.suites))
-        # )
-        query += sql.SQL(" a.suite in ('petra')")
+        page_token = body.page_tokens.get(asset)
+
+        fts_queries.append(
+            {
+                "sql": query.as_string(conn),
+                "asset": asset,
+                "shape": (
+                    asset,
+                    bool(tsquery),
+                    bool(tag),
+                    len(like_terms),
+                    len(uwi_terms),
+                ),
+                "params": params,
+                "seek": decode_page_token(page_token),
+                "cache_key": (
+                    normalize_tsquery(tsquery),
+                    like_terms,
+                    uwi_terms,
+                    tag,
+                    count_mode,
+                    page_token,
+                ),
+            }
+        )
+
+    return fts_queries
 
-        # screen out blanks; wildcard chars treated literally here
-        is_valid_tag = (
-            body.tag and isinstance(body.tag, str) and re.search(r"\S", body.tag)
+
+def estimate_hits(cur, query: str) -> int:
+    """
+    The planner's row estimate for a query (no execution)
+    :param cur: A psycopg2 cursor
+    :param query: An FTS query string
+    :return: Estimated number of matching rows
+    """
+    cur.execute(sql.SQL("EXPLAIN (FORMAT JSON) {}").format(sql.SQL(query)))
+    plan = cur.fetchone()[0]
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def prepare_page(cur, q: Dict[str, Any], page: str) -> str:
+    """
+    Get the name of the prepared page statement for a query shape, preparing
+    it on this connection first if needed. Search values are $n parameters
+    (tsquery, tag, ILIKE and uwi patterns, then the seek rank and id), so one
+    statement serves every search of the same shape.
+    :param cur: A cursor on a SearchConnection
+    :param q: An item from make_asset_fts_queries
+    :param page: A PAGE_TEMPLATES key
+    :return: The prepared statement name
+    """
+    key = (q["shape"], page, bool(q["seek"]))
+    name = cur.connection.prepared.get(key)
+    if name:
+        return name
+
+    asset, has_tsquery, has_tag, like_count, uwi_count = q["shape"]
+    placeholders = (sql.SQL(f"${n}") for n in itertools.count(1))
+    types = []
+
+    tsquery = tag = None
+    if has_tsquery:
+        tsquery = next(placeholders)
+        types.append("text")
+    if has_tag:
+        tag = next(placeholders)
+        types.append("text")
+    like_terms = [next(placeholders) for _ in range(like_count)]
+    uwi_terms = [(next(placeholders), next(placeholders)) for _ in range(uwi_count)]
+    types.extend(["text"] * (like_count + 2 * uwi_count))
+
+    query, ranked = compose_asset_query(asset, tsquery, tag, like_terms, uwi_terms)
+
+    seek = sql.SQL("")
+    if q["seek"]:
+        seek = SEEK_SQL.format(rank=next(placeholders), id=next(placeholders))
+        types.extend(["real", "text"])
+
+    statement = PAGE_TEMPLATES[page].format(
+        query=query,
+        ranked=ranked,
+        limit=sql.Literal(SEARCH_LIMIT + 1),
+        cap=sql.Literal(SEARCH_COUNT_CAP),
+        seek=seek,
+    )
+
+    name = f"search_page_{len(cur.connection.prepared)}"
+    signature = f"({", ".join(types)})" if types else ""
+
+    start = time.perf_counter()
+    cur.execute(
+        sql.SQL("PREPARE {} {} AS {}").format(
+            sql.Identifier(name), sql.SQL(signature), statement
         )
-        if is_valid_tag:
-            query += sql.SQL(" AND a.tag = {}").format(sql.Literal(body.tag))
-
-        # screen out terms comprised of only wildcards/spaces
-        is_valid_terms = (
-            body.terms
-            and isinstance(body.terms, str)
-            and not re.match(r"^[*?\s]+$", body.terms)
+    )
+    search_metrics.record("prepare", time.perf_counter() - start)
+
+    cur.connection.prepared[key] = name
+    return name
+
+
+def fetch_page_and_total(
+    cur, q: Dict[str, Any], count_mode: str = "window", runs: Optional[list] = None
+) -> Tuple[List[Tuple[Any, ...]], Optional[int], bool, Optional[str]]:
+    """
+    Fetch a page of SEARCH_LIMIT hits, most relevant first, and the total hit
+    count in a single execution (rather than a LIMIT query plus a COUNT(*)
+    subquery). The page starts after q["seek"] if there is a page token. One
+    extra row is fetched to tell whether another page follows.
+    count_mode:
+        window: exact total via count(*) OVER ()
+        capped: exact total up to SEARCH_COUNT_CAP, which then stops counting
+        estimate: planner estimate if above SEARCH_ESTIMATE_THRESHOLD,
+            otherwise window
+    :param cur: A cursor on a SearchConnection
+    :param q: An item from make_asset_fts_queries
+    :param count_mode: window, capped or estimate
+    :param runs: If a list, the execution is appended for profile_runs
+    :return: tuple of (rows, total_hits, whether total_hits is exact, next
+        page token). Rows end with rank, id and total_hits columns.
+    """
+    page, estimate = choose_page(cur, q, count_mode)
+    name = prepare_page(cur, q, page)
+    params = list(q["params"]) + (list(q["seek"]) if q["seek"] else [])
+    statement = execute_sql(name, params)
+
+    start = time.perf_counter()
+    cur.execute(statement, params or None)
+    rows = cur.fetchall()
+    elapsed = time.perf_counter() - start
+    search_metrics.record("execute", elapsed)
+
+    if runs is not None:
+        runs.append(
+            {
+                "label": q["asset"],
+                "prepared": (q, page),
+                "params": params or None,
+                "elapsed": elapsed,
+                "query": q["sql"],
+            }
         )
-        if is_valid_terms:
-            terms = [
-                (
-                    re.sub(r"\*", ":*", re.sub(r"\?", "_", term))
-                    if re.search(r"[*?]", term)
-                    else term
-                )
-                for term in re.split(r"\s+", body.terms)
-                if term.strip()
-            ]
-            if terms:
-                tsquery = " & ".join(terms)
-                query += sql.SQL(" AND a.ts @@ to_tsquery('english', {})").format(
-                    sql.Literal(tsquery)
-                )
 
-        fts_queries.append({"sql": query.as_string(conn), "asset": asset})
+    return page_result(rows, count_mode, estimate, bool(q["seek"]))
 
-    # print("=========search q==================================")
-    # for q in fts_queries:
-    #     print(q)
-    #     # s = q["sql"].as_string(conn)  # not kosher, just checking
-    #     # print(s)
-    # print("===============++++++++============================")
-    return fts_queries
 
+def execute_sql(name: str, params: List[Any]) -> sql.Composed:
+    """
+    :param name: A prepared statement name (see prepare_page)
+    :param params: Its parameter values
+    :return: EXECUTE statement with a placeholder per parameter
+    """
+    if params:
+        return sql.SQL("EXECUTE {} ({})").format(
+            sql.Identifier(name),
+            sql.SQL(", ").join(sql.Placeholder() * len(params)),
+        )
+    return sql.SQL("EXECUTE {}").format(sql.Identifier(name))
 
-def search_local_pg(supabase, body: SearchTaskBody) -> str:
-    params = local_pg_params()
-    conn: psycopg2.extensions.connection = psycopg2.connect(**params)
 
-    fts_queries: List[Dict[str, str]] = make_asset_fts_queries(body, conn)
+def profile_runs(runs: List[dict]) -> None:
+    """
+    EXPLAIN ANALYZE the slow statements of a search on a pooled connection of
+    its own. This runs on _profile_executor after the hits are published, so
+    profiling never delays results. Prepared pages are prepared on this
+    connection first if needed.
+    :param runs: Executions collected by fetch_page_and_total/fetch_unified
+    :return: None
+    """
+    slow = [run for run in runs if run["elapsed"] * 1000 >= SEARCH_PROFILE_THRESHOLD_MS]
+    if not slow:
+        return
+
+    try:
+        with pooled_connection() as conn:
+            with conn.cursor() as cur:
+                for run in slow:
+                    statement = run.get("statement")
+                    if statement is None:
+                        name = prepare_page(cur, *run["prepared"])
+                        statement = execute_sql(name, run["params"] or [])
+                    profile_query(
+                        cur,
+                        run["label"],
+                        statement,
+                        run["params"],
+                        run["elapsed"],
+                        run["query"],
+                    )
+    except psycopg2.Error as error:
+        logger.warning(f"could not profile slow searches: {error}")
+
+    if SEARCH_PROFILE_FILE:
+        slow_query_log.dump(SEARCH_PROFILE_FILE)
+
+
+def choose_page(cur, q: Dict[str, Any], count_mode: str) -> Tuple[str, Optional[int]]:
+    """
+    :param cur: A psycopg2 cursor
+    :param q: An item from make_asset_fts_queries
+    :param count_mode: window, capped or estimate
+    :return: tuple of (PAGE_TEMPLATES key, planner estimate if it is used)
+    """
+    if count_mode == "estimate":
+        estimate = estimate_hits(cur, q["sql"])
+        if estimate > SEARCH_ESTIMATE_THRESHOLD:
+            return "page", estimate
+    if count_mode == "capped":
+        return "capped", None
+    return "window", None
+
+
+def page_result(
+    rows: List[Tuple[Any, ...]],
+    count_mode: str,
+    estimate: Optional[int],
+    seek: bool = False,
+) -> Tuple[List[Tuple[Any, ...]], Optional[int], bool, Optional[str]]:
+    """
+    :param rows: Up to SEARCH_LIMIT + 1 rows (the extra one means more follow)
+    :param count_mode: window, capped or estimate
+    :param estimate: The planner estimate, if it is the total
+    :param seek: Whether this page follows a page token
+    :return: tuple of (rows, total_hits, whether total_hits is exact, next page
+        token). The total is None for an empty page after a token, since the
+        count rides on the rows.
+    """
+    token = next_page_token(rows)
+    rows = rows[:SEARCH_LIMIT]
 
-    limit = 100
-    summary = []
+    if estimate is not None:
+        return rows, estimate, False, token
+    if not rows:
+        return rows, (None if seek else 0), not seek, token
 
-    for q in fts_queries:
+    total_hits = rows[0][-1]
+    exact = count_mode != "capped" or total_hits < SEARCH_COUNT_CAP
+    return rows, total_hits, exact, token
 
-        summary.append({"asset": q["asset"], "sql": q["sql"]})
 
-        with conn.cursor() as cur:
-            # query = q["sql"] if body.save_to_store else q["sql"] + " LIMIT 100"
-            cur.execute(q["sql"] + f" LIMIT {limit}")
-            res = cur.fetchall()
-
-            cur.execute(f"SELECT COUNT(*) FROM ({q["sql"]}) AS subquery;")
-            total_hits = cur.fetchone()[0]
-
-            for d in summary:
-                if d["asset"] == q["asset"]:
-                    d["total_hits"] = total_hits
-
-            # if total_hi
-            # hits > 100:
-            #     print("TTTTTTTTTTTTTTTTTT")
-            #     print("more than 100 hits. want to save to file?")
-            #     print("TTTTTTTTTTTTTTTTTT")
-
-            # TODO: send to search_results instead of message
-            # logger.send_message(
-            #     directive="storage_prompt",
-            #     data={"note": f"fts search yields: {total_hits} hits. Save?"},
-            #     workflow="search",
-            # )
-
-        hits = (
-            [
-                {
-                    "search_id": body.search_id,
-                    "directive": "search_result",
-                    "asset": q["asset"],
-                    "active": True,
-                    "search_body": body.to_dict(),
-                    "sql": q["sql"],
-                    "user_id": body.user_id,
-                }
-            ]
-            if cur.rowcount == 0
-            else [
-                {
-                    "search_id": body.search_id,
-                    "directive": "search_result",
-                    "asset": q["asset"],
-                    "active": True,
-                    "search_body": body.to_dict(),
-                    "sql": q["sql"],
-                    "user_id": body.user_id,
-                    "repo_id": row[0],
-                    "repo_name": row[1],
-                    "well_id": row[2],
-                    "suite": row[3],
-                    "tag": row[4],
-                    "doc": row[5],
-                }
-                for row in res
-            ]
+def fetch_unified(
+    cur,
+    fts_queries: List[Dict[str, Any]],
+    count_mode: str = "window",
+    runs: Optional[list] = None,
+) -> Dict[str, Tuple[List[Tuple[Any, ...]], Optional[int], bool, Optional[str]]]:
+    """
+    Fetch every asset's page and total in one round trip: each asset is a
+    UNION ALL branch with its own SEARCH_LIMIT and count, so the planner may
+    run the branches in parallel (Parallel Append). Values are bound as named
+    parameters rather than prepared, since asset combinations vary too much
+    to reuse statements.
+    :param cur: A psycopg2 cursor
+    :param fts_queries: Items from make_asset_fts_queries
+    :param count_mode: window, capped or estimate
+    :param runs: If a list, the execution is appended for profile_runs
+    :return: Dict of asset -> (rows, total_hits, whether total_hits is exact,
+        next page token)
+    """
+    branches = []
+    params = {}
+    estimates = {}
+
+    for i, q in enumerate(fts_queries):
+        asset, has_tsquery, has_tag, like_count, uwi_count = q["shape"]
+        values = iter(q["params"])
+
+        def bind(name):
+            params[f"q{i}_{name}"] = next(values)
+            return sql.Placeholder(f"q{i}_{name}")
+
+        tsquery = bind("tsquery") if has_tsquery else None
+        tag = bind("tag") if has_tag else None
+        like_terms = [bind(f"like{n}") for n in range(like_count)]
+        uwi_terms = [(bind(f"uwi{n}"), bind(f"uwi{n}_like")) for n in range(uwi_count)]
+
+        query, ranked = compose_asset_query(asset, tsquery, tag, like_terms, uwi_terms)
+
+        seek = sql.SQL("")
+        if q["seek"]:
+            params[f"q{i}_rank"], params[f"q{i}_id"] = q["seek"]
+            seek = SEEK_SQL.format(
+                rank=sql.Placeholder(f"q{i}_rank"), id=sql.Placeholder(f"q{i}_id")
+            )
+
+        page, estimates[asset] = choose_page(cur, q, count_mode)
+        branches.append(
+            sql.SQL("({})").format(
+                PAGE_TEMPLATES[page].format(
+                    query=query,
+                    ranked=ranked,
+                    limit=sql.Literal(SEARCH_LIMIT + 1),
+                    cap=sql.Literal(SEARCH_COUNT_CAP),
+                    seek=seek,
+                )
+            )
         )
 
-        logger.send_message(
-            directive="note",
-            data={"note": f"fts for " f"{q["asset"]} yields: {len(hits)} hits"},
-            workflow="search",
+    statement = sql.SQL(" UNION ALL ").join(branches)
+
+    start = time.perf_counter()
+    cur.execute(statement, params)
+    rows = cur.fetchall()
+    elapsed = time.perf_counter() - start
+    search_metrics.record("unified", elapsed)
+
+    if runs is not None:
+        runs.append(
+            {
+                "label": ",".join(q["asset"] for q in fts_queries),
+                "statement": statement,
+                "params": params,
+                "elapsed": elapsed,
+                "query": statement.as_string(cur),
+            }
         )
 
-        if int(total_hits) > 0:
-            supabase.table("search_result").upsert(hits).execute()
+    # the asset column precedes rank, id and total_hits
+    by_asset = {q["asset"]: [] for q in fts_queries}
+    for row in rows:
+        by_asset[row[-4]].append(row)
 
-    supabase.table("search_result").insert(
+    seeks = {q["asset"]: bool(q["seek"]) for q in fts_queries}
+    return {
+        asset: page_result(asset_rows, count_mode, estimates[asset], seeks[asset])
+        for asset, asset_rows in by_asset.items()
+    }
+
+
+def next_page_token(rows: List[Tuple[Any, ...]]) -> Optional[str]:
+    """
+    :param rows: A page as fetched, with up to SEARCH_LIMIT + 1 rows
+    :return: Token for the following page, or None if this was the last
+    """
+    if len(rows) <= SEARCH_LIMIT:
+        return None
+    last = rows[SEARCH_LIMIT - 1]
+    return encode_page_token(last[-3], last[-2])
+
+
+@contextmanager
+def pooled_connection():
+    """
+    Borrow an autocommit connection from the shared search pool. The pool is
+    created on first use and sized so that every search queue worker can run
+    all of its asset queries at once (ThreadedConnectionPool does not block
+    when exhausted).
+    :return: A psycopg2 connection (returned to the pool on exit)
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadedConnectionPool(
+                1,
+                SEARCH_POOL_MAX,
+                connection_factory=SearchConnection,
+                **local_pg_params(),
+            )
+
+    conn = _pool.getconn()
+    try:
+        conn.autocommit = True
+        yield conn
+    finally:
+        _pool.putconn(conn, close=bool(conn.closed))
+
+
+def summarize_rows(rows: List[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
+    """
+    Replace each row's doc with its summary (see publish.py). Only summaries
+    are published, so only summaries are cached, not full docs.
+    :param rows: A page from fetch_page_and_total or fetch_unified
+    :return: The rows with summarized docs
+    """
+    return [row[:5] + (summarize_doc(row[5]),) + tuple(row[6:]) for row in rows]
+
+
+def make_hits(
+    body: SearchTaskBody, q: Dict[str, Any], rows: List[Tuple[Any, ...]]
+) -> List[dict]:
+    """
+    search_body and sql ride on the asset's first hit only; the client gets
+    both from the storage_prompt too.
+    :param body: SearchTaskBody
+    :param q: An item from make_asset_fts_queries
+    :param rows: A page, with docs already summarized (see summarize_rows)
+    :return: search_result rows
+    """
+    return [
         {
             "search_id": body.search_id,
+            "directive": "search_result",
+            "asset": q["asset"],
+            "active": True,
+            "search_body": body.to_dict() if i == 0 else None,
+            "sql": q["sql"] if i == 0 else None,
             "user_id": body.user_id,
-            "directive": "storage_prompt",
-            "search_body": summary,
+            "repo_id": row[0],
+            "repo_name": row[1],
+            "well_id": row[2],
+            "suite": row[3],
+            "tag": row[4],
+            "doc": row[5],
         }
-    ).execute()
+        for i, row in enumerate(rows)
+    ]
 
-    return "maybe donezo"
 
+def asset_summary(
+    q: Dict[str, Any],
+    rows: List[Tuple[Any, ...]],
+    total_hits: Optional[int],
+    exact: bool,
+    token: Optional[str],
+) -> dict:
+    """
+    :return: The asset's storage_prompt summary
+    """
+    logger.send_message(
+        directive="note",
+        data={"note": f"fts for " f"{q["asset"]} yields: {len(rows)} hits"},
+        workflow="search",
+    )
+    return {
+        "asset": q["asset"],
+        "sql": q["sql"],
+        "total_hits": total_hits,
+        "total_hits_exact": exact,
+        "next_page_token": token,
+    }
+
+
+def search_asset(supabase, body: SearchTaskBody, q: Dict[str, Any]) -> dict:
+    """
+    Run one asset's FTS query on a pooled connection (unless a cached result
+    is still current) and publish its hits to supabase, in size-bounded
+    chunks, as soon as they are ready.
+    :param supabase: A SupabaseClient
+    :param body: SearchTaskBody
+    :param q: An item from make_asset_fts_queries
+    :return: The asset's storage_prompt summary
+    """
+    count_mode = body.count_mode if body.count_mode in COUNT_MODES else "window"
+
+    runs = [] if body.profile or SEARCH_PROFILE else None
+
+    generation = search_cache.generation(q["asset"])
+    cached = search_cache.get(q["asset"], q["cache_key"])
+    if cached:
+        res, total_hits, exact, token = cached
+    else:
+        with pooled_connection() as conn:
+            with conn.cursor() as cur:
+                res, total_hits, exact, token = fetch_page_and_total(
+                    cur, q, count_mode, runs
+                )
+        res = summarize_rows(res)
+        search_cache.put(
+            q["asset"], q["cache_key"], (res, total_hits, exact, token), generation
+        )
+
+    hits = make_hits(body, q, res)
+    if hits:
+        publish_hits(supabase, hits)
+
+    if runs:
+        _profile_executor.submit(profile_runs, runs)
 
-def get_output_file(task):
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    file_extension = ".csv" if task.file_format == "csv" else ".json"
-    output_file = f"{task.asset}_{timestamp}_{task.user_id}{file_extension}"
-    return output_file
+    return asset_summary(q, res, total_hits, exact, token)
 
 
-def query_to_file(task: ExportTaskBody):
+def search_unified(
+    supabase, body: SearchTaskBody, fts_queries: List[Dict[str, Any]]
+) -> Dict[str, dict]:
     """
-    Execute a SQL query and write the results to a CSV file.
+    Search every asset with one UNION ALL query (assets with a current cached
+    result are left out of it) and publish all hits merged into a single
+    global ranking, best first across assets.
+    :param supabase: A SupabaseClient
+    :param body: SearchTaskBody
+    :param fts_queries: Items from make_asset_fts_queries
+    :return: Dict of asset -> storage_prompt summary
+    """
+    count_mode = body.count_mode if body.count_mode in COUNT_MODES else "window"
 
-    Args:
-        task: ExportTaskBody
+    results = {}
+    generations = {q["asset"]: search_cache.generation(q["asset"]) for q in fts_queries}
+    for q in fts_queries:
+        cached = search_cache.get(q["asset"], q["cache_key"])
+        if cached:
+            results[q["asset"]] = cached
+
+    runs = [] if body.profile or SEARCH_PROFILE else None
+
+    uncached = [q for q in fts_queries if q["asset"] not in results]
+    if uncached:
+        with pooled_connection() as conn:
+            with conn.cursor() as cur:
+                fetched = fetch_unified(cur, uncached, count_mode, runs)
+        for q in uncached:
+            rows, total_hits, exact, token = fetched[q["asset"]]
+            fetched[q["asset"]] = (summarize_rows(rows), total_hits, exact, token)
+            search_cache.put(
+                q["asset"], q["cache_key"], fetched[q["asset"]], generations[q["asset"]]
+            )
+        results.update(fetched)
+
+    hits = []
+    for q in fts_queries:
+        rows = results[q["asset"]][0]
+        hits.extend(zip(rows, make_hits(body, q, rows)))
+
+    # global rank: (rank, id) descending, as within each asset
+    hits.sort(key=lambda pair: (pair[0][-3], pair[0][-2]), reverse=True)
+    if hits:
+        publish_hits(supabase, [hit for _, hit in hits])
+
+    if runs:
+        _profile_executor.submit(profile_runs, runs)
 
-    Returns:
-        None
+    return {q["asset"]: asset_summary(q, *results[q["asset"]]) for q in fts_queries}
+
+
+def search_local_pg(supabase, body: SearchTaskBody) -> str:
     """
-    batch_size = 1000
-    output_file = get_output_file(task)
-    output_path = os.path.join(os.environ.get("EXPORT_DIR"), output_file)
+    Run the FTS query for each asset concurrently (up to SEARCH_ASSET_WORKERS)
+    so a search takes about as long as its slowest asset rather than the sum
+    of all of them. Hits are published per asset as each one finishes, then a
+    storage_prompt summarizes every asset. A unified search instead runs all
+    assets as a single query (see search_unified).
+    :param supabase: A SupabaseClient
+    :param body: SearchTaskBody
+    :return: TODO
+    """
+    with pooled_connection() as conn:
+        fts_queries: List[Dict[str, Any]] = make_asset_fts_queries(body, conn)
 
-    try:
-        params = local_pg_params()
-        with closing(psycopg2.connect(**params)) as conn:
-            with closing(conn.cursor(cursor_factory=psycopg2.extras.DictCursor)) as cur:
-                cur.execute(task.sql)
-
-                first_row = cur.fetchone()
-                if not first_row:
-                    print("No data returned from query.")
-                    return
-
-                # Because we may select more than just doc
-                colnames = [desc[0] for desc in cur.description]
-                doc_index = colnames.index("doc")
-
-                if task.file_format == "csv":
-                    # rows = []
-
-                    first_doc = first_row[doc_index]
-
-                    header_keys = []
-                    for key1, value1 in first_doc.items():
-                        if isinstance(value1, dict):
-                            for key2 in value1.keys():
-                                header_keys.append(f"{key1}__{key2}")
-                        else:
-                            header_keys.append(key1)
-
-                    with open(output_path, mode="w", newline="") as csvfile:
-                        csv_writer = csv.writer(csvfile)
-
-                        csv_writer.writerow(header_keys)
-
-                        while True:
-                            rows = cur.fetchmany(size=batch_size)
-                            if not rows:
-                                break
-                            for row in rows:
-                                csv_row = []
-                                doc = row[doc_index]
-                                print("--------------")
-                                for key in header_keys:
-                                    key_parts = key.split("__")
-                                    value = doc
-                                    for part in key_parts:
-                                        if part in value:
-                                            value = value[part]
-                                            if isinstance(value, list):
-                                                value = json.dumps(value)
-                                        else:
-                                            value = ""
-                                    csv_row.append(value)
-                                csv_writer.writerow(csv_row)
-
-                        #
-                        # # Write the first row to the CSV file
-                        # csv_row = (
-                        #     [json_data.get(key) for key in json_keys]
-                        #     if json_data
-                        #     else [None] * len(json_keys)
-                        # )
-                        # csv_writer.writerow(csv_row)
-                        #
-                        # # Fetch and write in batches
-
-                        ###
-                        # while True:
-                        #     rows = cur.fetchmany(size=batch_size)
-                        #     if not rows:
-                        #         break
-                        #     for row in rows:
-                        #         json_data = row[doc_index]
-
-                        ###
-                        #         csv_row = (
-                        #             [json_data.get(key) for key in json_keys]
-                        #             if json_data
-                        #             else [None] * len(json_keys)
-                        #         )
-                        #         csv_writer.writerow(csv_row)
-
-                elif task.file_format == "json":
-                    data = []
-
-                    while True:
-                        rows = cur.fetchmany(size=batch_size)
-                        if not rows:
-                            break
-                        for row in rows:
-                            json_data = row[doc_index]
-                            data.append(json_data if json_data else {})
-
-                    with open(output_path, mode="w") as jsonfile:
-                        json.dump(data, jsonfile, indent=4)
-
-        print(f"Data successfully written to {output_path}")
-
-    except Exception as e:
-        import traceback
-
-        print(f"An error occurred: {e}")
-        traceback.print_exc()
+    summaries = {}
+
+    if fts_queries and body.unified:
+        summaries = search_unified(supabase, body, fts_queries)
+
+    elif fts_queries:
+        workers = min(SEARCH_ASSET_WORKERS, len(fts_queries))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(search_asset, supabase, body, q) for q in fts_queries
+            ]
+            for future in as_completed(futures):
+                summary = future.result()
+                summaries[summary["asset"]] = summary
+
+    supabase.table("search_result").insert(
+        {
+            "search_id": body.search_id,
+            "user_id": body.user_id,
+            "directive": "storage_prompt",
+            "search_body": [summaries[q["asset"]] for q in fts_queries],
+        }
+    ).execute()
+
+    logger.debug(f"search cache: {search_cache.stats()}")
+    logger.debug(f"search statements: {search_metrics.stats()}")
+
+    return "maybe donezo"
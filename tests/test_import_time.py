@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+# purr_worker must import without network I/O or heavy modules (recon, export)
+IMPORT_BUDGET_US = 1_000_000
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# a supabase client that fails on any use: importing must not sign in
+SUPABASE_STUB = textwrap.dedent("""
+    class _Auth:
+        def __getattr__(self, name):
+            raise AssertionError(f"supabase auth.{name} called during import")
+
+
+    class _Client:
+        auth = _Auth()
+
+
+    def create_client(url, key):
+        return _Client()
+    """)
+
+
+def import_time(module: str, stubs: Path) -> dict:
+    """
+    :param module: The module to import in a fresh interpreter
+    :param stubs: A directory put first on PYTHONPATH
+    :return: Dict of module name -> cumulative import time (us)
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (str(stubs), str(REPO_ROOT), env.get("PYTHONPATH")) if p
+    )
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert res.returncode == 0, res.stderr
+
+    times = {}
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_purr_worker_import_time(tmp_path):
+    stubs = tmp_path / "stubs"
+    (stubs / "supabase").mkdir(parents=True)
+    (stubs / "supabase" / "__init__.py").write_text(SUPABASE_STUB)
+
+    times = import_time("purr_worker", stubs)
+
+    assert times["purr_worker"] < IMPORT_BUDGET_US, (
+        f"importing purr_worker took {times['purr_worker'] / 1e6:.2f}s "
+        f"(budget {IMPORT_BUDGET_US / 1e6:.2f}s)"
+    )
+    for deferred in ("recon", "search.export", "concave_hull"):
+        assert deferred not in times, f"{deferred} is imported by purr_worker"